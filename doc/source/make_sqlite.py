@@ -0,0 +1,14 @@
+import sqlite3
+
+with sqlite3.connect("inventory.sqlite") as db:
+    db.execute("CREATE TABLE part (name TEXT, family TEXT, quantity INTEGER)")
+    db.executemany(
+        "INSERT INTO part VALUES (?, ?, ?)",
+        [
+            ("bolt", "fastener", 120),
+            ("nut", "fastener", 300),
+            ("washer", "fastener", 80),
+            ("hinge", "hardware", 12),
+            ("bracket", "hardware", 40),
+        ],
+    )
@@ -1,15 +1,188 @@
-from sphinx.util import logging
+import os
 
-from . import directive, domain, version
+from . import version
 
 __version__ = version.__version__
-LOG = logging.getLogger(__name__)
+
+# The other modules of the extension import Sphinx and are only
+# imported once Sphinx calls setup(), so the CLI and the helpers can
+# be imported without paying for Sphinx.
+
+
+def _logger():
+    from sphinx.util import logging
+
+    return logging.getLogger(__name__)
+
+
+def _configure(app, config):
+    from sphinx.errors import ConfigError
+
+    from . import directive, loaders
+
+    try:
+        loaders.select_parser_backends(config.datatemplates_parser_backends)
+    except ValueError as err:
+        raise ConfigError(f"datatemplates_parser_backends: {err}") from err
+    loaders.csv_stream_threshold = config.datatemplates_csv_stream_threshold
+    loaders.data_cache.resize(config.datatemplates_cache_max_bytes)
+    directive.inline_templates.resize(config.datatemplates_template_cache_size)
+    directive.rendered_templates.resize(config.datatemplates_render_cache_size)
+    directive.parsed_fragments.resize(config.datatemplates_doctree_cache_size)
+    directive.resolved_loaders.resize(config.datatemplates_load_cache_size)
+    directive.loaded_sources.resize(config.datatemplates_load_cache_size)
+
+
+def _report_parser_backends(app, exception):
+    from . import loaders
+
+    # Backends are only imported for the formats that were used.
+    for data_format, (name, _) in sorted(loaders._active_backends.items()):
+        _logger().info("datatemplates: used %s parser backend %r", data_format, name)
+
+
+def _open_disk_cache(app):
+    from . import cache, loaders
+
+    if app.config.datatemplates_disk_cache:
+        loaders.disk_cache = cache.DiskCache(
+            os.path.join(app.doctreedir, "datatemplates")
+        )
+
+
+def _find_changed_sources(app, env, added, changed, removed):
+    if not app.config.datatemplates_content_dependencies:
+        return []
+    domain = env.get_domain("datatemplate")
+    candidates = [
+        docname
+        for docname in domain.sources
+        if docname not in changed and docname not in removed
+    ]
+    return domain.changed_documents(env.srcdir, candidates)
+
+
+def _reset_build_stats(app, env, docnames):
+    # Only report the directives read by this build.
+    domain = env.get_domain("datatemplate")
+    domain.cache_stats.clear()
+    domain.stats.clear()
+
+
+def _report_caches(app, exception):
+    from . import directive, loaders
+
+    LOG = _logger()
+    data_cache = loaders.data_cache
+    LOG.verbose(
+        "datatemplates: data cache: %d hits, %d misses, %d entries, %d bytes",
+        data_cache.hits,
+        data_cache.misses,
+        len(data_cache),
+        data_cache.total_bytes,
+    )
+    # Release the parsed data along with the build.
+    data_cache.clear()
+
+    disk_cache = loaders.disk_cache
+    if disk_cache is not None:
+        LOG.verbose(
+            "datatemplates: disk cache: %d hits, %d misses",
+            disk_cache.hits,
+            disk_cache.misses,
+        )
+        disk_cache.collect_garbage(app.config.datatemplates_disk_cache_max_age)
+        loaders.disk_cache = None
+
+    inline_templates = directive.inline_templates
+    LOG.verbose(
+        "datatemplates: inline template cache: %d hits, %d misses, %.3fs compiling",
+        inline_templates.hits,
+        inline_templates.misses,
+        inline_templates.compile_seconds,
+    )
+    inline_templates.clear()
+
+    loaded_sources = directive.loaded_sources
+    LOG.verbose(
+        "datatemplates: load() cache: %d hits, %d misses",
+        loaded_sources.hits,
+        loaded_sources.misses,
+    )
+    loaded_sources.clear()
+    directive.resolved_loaders.clear()
+
+    domain = app.env.get_domain("datatemplate")
+    for name, cache in [
+        ("render", directive.rendered_templates),
+        ("doctree", directive.parsed_fragments),
+    ]:
+        if cache.maxsize:
+            totals = domain.cache_totals(name)
+            lookups = totals["hits"] + totals["misses"]
+            LOG.info(
+                "datatemplates: %s cache: %d hits, %d misses, %d not cacheable "
+                "(%.0f%% hit rate)",
+                name,
+                totals["hits"],
+                totals["misses"],
+                totals["uncacheable"],
+                100 * totals["hits"] / lookups if lookups else 0,
+            )
+        cache.clear()
+
+    dbm_handles = loaders.dbm_handles
+    LOG.verbose("datatemplates: dbm handles: %d opened", dbm_handles.opened)
+    dbm_handles.close_all()
+
+    sqlite_connections = loaders.sqlite_connections
+    LOG.verbose(
+        "datatemplates: sqlite connections: %d opened", sqlite_connections.opened
+    )
+    sqlite_connections.close_all()
 
 
 def setup(app):
-    LOG.info("initializing sphinxcontrib.datatemplates")
+    from . import cache, directive, domain, prefetch, stats
+
+    _logger().info("initializing sphinxcontrib.datatemplates")
     app.add_directive("datatemplate", directive.DataTemplateLegacy)
     app.add_domain(domain.DataTemplateDomain)
+    app.add_config_value("datatemplates_cache_max_bytes", cache.DEFAULT_MAX_BYTES, "")
+    app.add_config_value("datatemplates_disk_cache", True, "")
+    app.add_config_value("datatemplates_disk_cache_max_age", cache.DEFAULT_MAX_AGE, "")
+    app.add_config_value(
+        "datatemplates_template_cache_size", cache.DEFAULT_TEMPLATE_CACHE_SIZE, ""
+    )
+    app.add_config_value(
+        "datatemplates_load_cache_size", cache.DEFAULT_LOAD_CACHE_SIZE, ""
+    )
+    app.add_config_value("datatemplates_render_cache_size", 0, "")
+    app.add_config_value("datatemplates_doctree_cache_size", 0, "")
+    app.add_config_value("datatemplates_content_dependencies", True, "env")
+    app.add_config_value("datatemplates_csv_stream_threshold", None, "env")
+    app.add_config_value("datatemplates_parser_backends", {}, "")
+    app.add_config_value("datatemplates_stats", False, "")
+    app.add_config_value("datatemplates_stats_top", stats.DEFAULT_TOP, "")
+    app.add_config_value("datatemplates_stats_memory", False, "")
+    app.add_config_value("datatemplates_profile", [], "")
+    app.add_config_value("datatemplates_prefetch", False, "")
+    app.add_config_value(
+        "datatemplates_prefetch_max_sources", prefetch.DEFAULT_MAX_SOURCES, ""
+    )
+    app.add_config_value(
+        "datatemplates_prefetch_max_bytes", prefetch.DEFAULT_MAX_BYTES, ""
+    )
+    app.add_config_value("datatemplates_prefetch_workers", None, "")
+    app.connect("config-inited", _configure)
+    app.connect("builder-inited", _open_disk_cache)
+    app.connect("builder-inited", stats.start_memory_tracing)
+    app.connect("env-get-outdated", _find_changed_sources)
+    app.connect("env-before-read-docs", _reset_build_stats)
+    app.connect("env-before-read-docs", prefetch.prefetch_sources)
+    app.connect("build-finished", _report_parser_backends)
+    app.connect("build-finished", _report_caches)
+    app.connect("build-finished", stats.write_report)
 
     return {
         "version": version.__version__,
@@ -0,0 +1,528 @@
+import collections
+import contextlib
+import hashlib
+import os
+import pickle
+import sys
+import tempfile
+import threading
+import time
+
+from sphinxcontrib.datatemplates import version
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    # Windows. Entries are still replaced atomically, but parallel
+    # workers may parse the same source more than once.
+    fcntl = None
+
+# Default upper bound for the estimated size of the parsed data kept
+# in memory by the build-wide cache.
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+# Default number of days an unused entry is kept in the disk cache.
+DEFAULT_MAX_AGE = 30
+
+# Default number of compiled inline templates to keep.
+DEFAULT_TEMPLATE_CACHE_SIZE = 128
+
+# Default number of sources loaded from templates to keep.
+DEFAULT_LOAD_CACHE_SIZE = 128
+
+_digests = {}
+
+
+def file_stamp(path):
+    "Return a cheap fingerprint for the current state of the file."
+    st = os.stat(path)
+    return (st.st_mtime_ns, st.st_size)
+
+
+def file_digest(path):
+    """Return a hash of the contents of the file.
+
+    The digest is remembered until the modification time or size of
+    the file changes.
+
+    :param path: The file to hash.
+    """
+    path = os.path.abspath(path)
+    stamp = file_stamp(path)
+    known = _digests.get(path)
+    if known is not None and known[0] == stamp:
+        return known[1]
+    with open(path, "rb") as f:
+        digest = hashlib.file_digest(f, "blake2b").hexdigest()
+    _digests[path] = (stamp, digest)
+    return digest
+
+
+# Raised by pickle.load() for entries it cannot read back.
+_UNPICKLING_ERRORS = (
+    EOFError,
+    pickle.UnpicklingError,
+    AttributeError,
+    ImportError,
+    IndexError,
+    TypeError,
+    ValueError,
+)
+
+
+def _canonical(value):
+    # The order of sets and dicts can change between processes, for
+    # example with PYTHONHASHSEED, so it is left out of their repr.
+    if isinstance(value, (set, frozenset)):
+        return ("set", sorted((_canonical(v) for v in value), key=repr))
+    if isinstance(value, dict):
+        items = ((_canonical(k), _canonical(v)) for k, v in value.items())
+        return ("dict", sorted(items, key=repr))
+    if isinstance(value, (list, tuple)):
+        return type(value)(_canonical(v) for v in value)
+    return value
+
+
+def _key_digest(*parts):
+    # Data stored by another version, or with another pickle protocol,
+    # may have a different shape, so it is never looked up.
+    parts = (version.__version__, pickle.HIGHEST_PROTOCOL, *parts)
+    text = repr(_canonical(parts))
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def estimate_size(obj):
+    """Estimate the memory used by a parsed data structure.
+
+    Walks containers, mappings, and element trees, counting each
+    object only once.
+
+    :param obj: The object to measure.
+    """
+    seen = set()
+    size = 0
+    pending = [obj]
+    while pending:
+        o = pending.pop()
+        if id(o) in seen:
+            continue
+        seen.add(id(o))
+        size += sys.getsizeof(o)
+        if isinstance(o, dict):
+            pending.extend(o.keys())
+            pending.extend(o.values())
+        elif isinstance(o, (list, tuple, set, frozenset)):
+            pending.extend(o)
+        elif hasattr(o, "attrib") and hasattr(o, "iter"):
+            # xml.etree.ElementTree.Element
+            pending.append(o.attrib)
+            pending.append(o.text)
+            pending.append(o.tail)
+            pending.extend(o)
+    return size
+
+
+class _Entry:
+    def __init__(self, stamp, data, size):
+        self.stamp = stamp
+        self.data = data
+        self.size = size
+
+
+class DataCache:
+    """Least-recently-used cache of parsed data sources.
+
+    Entries are keyed by the caller and validated against the
+    modification time and size of the file they were parsed from, so
+    a changed file is parsed again on the next lookup. The total
+    estimated size of the cached data is kept under ``max_bytes``.
+
+    :param max_bytes: Upper bound for the estimated size of the
+        cached data. ``0`` disables the cache.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = collections.OrderedDict()
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get_or_load(self, key, path, parse, size_factor=1):
+        """Return the cached data for ``key``, calling ``parse`` on a miss.
+
+        :param key: Hashable key identifying the parsed data.
+        :param path: The file the data is parsed from.
+        :param parse: Callable without arguments returning the data.
+        :param size_factor: Estimated number of bytes the parsed data
+            takes for each byte of the file.
+        """
+        stamp = file_stamp(path)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.stamp == stamp:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry.data
+            self.misses += 1
+        data = parse()
+        # Walking the data to measure it would cost about as much as
+        # parsing it, so go by the size of the file instead.
+        self.put(key, stamp, data, stamp[1] * size_factor)
+        return data
+
+    def put(self, key, stamp, data, size):
+        "Store ``data`` of ``size`` bytes under ``key``, evicting old entries."
+        if not self.max_bytes:
+            return
+        with self._lock:
+            self._discard(key)
+            if size > self.max_bytes:
+                # Never let a single source flush everything else.
+                return
+            self._entries[key] = _Entry(stamp, data, size)
+            self.total_bytes += size
+            self._evict(self.max_bytes)
+
+    def resize(self, max_bytes):
+        "Change the size limit, evicting entries that no longer fit."
+        with self._lock:
+            self.max_bytes = max_bytes
+            self._evict(max_bytes)
+
+    def clear(self):
+        "Drop all entries and reset the statistics."
+        with self._lock:
+            self._entries.clear()
+            self.total_bytes = 0
+            self.hits = 0
+            self.misses = 0
+
+    def _discard(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.total_bytes -= entry.size
+
+    def _evict(self, max_bytes):
+        while self._entries and self.total_bytes > max_bytes:
+            _, entry = self._entries.popitem(last=False)
+            self.total_bytes -= entry.size
+
+
+class TemplateCache:
+    """Least-recently-used cache of compiled inline templates.
+
+    Templates are keyed by a hash of their source and only reused with
+    the Jinja environment that compiled them.
+
+    :param maxsize: Number of compiled templates to keep. ``0``
+        disables the cache.
+    """
+
+    def __init__(self, maxsize=DEFAULT_TEMPLATE_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.compile_seconds = 0.0
+        self._entries = collections.OrderedDict()
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get_or_compile(self, environment, source):
+        """Return ``source`` compiled by ``environment``.
+
+        :param environment: The :py:class:`jinja2.Environment` to use.
+        :param source: The template source.
+        """
+        key = (
+            id(environment),
+            hashlib.blake2b(source.encode("utf-8"), digest_size=16).digest(),
+        )
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] is environment:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+        start = time.perf_counter()
+        template = environment.from_string(source)
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self.compile_seconds += elapsed
+            if self.maxsize:
+                self._entries[key] = (environment, template)
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+        return template
+
+    def resize(self, maxsize):
+        "Change the number of templates kept, evicting the oldest."
+        with self._lock:
+            self.maxsize = maxsize
+            while len(self._entries) > maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        "Drop all entries and reset the statistics."
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+            self.compile_seconds = 0.0
+
+
+class LRUCache:
+    """Least-recently-used cache of arbitrary values.
+
+    The caller builds the keys, so it decides which values are
+    interchangeable. Lookups and stores with a key of ``None`` are
+    ignored.
+
+    :param maxsize: Number of values to keep. ``0`` disables the
+        cache.
+    """
+
+    def __init__(self, maxsize=0):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = collections.OrderedDict()
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        "Return the value stored under ``key``, or ``None``."
+        if key is None:
+            return None
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            else:
+                self.misses += 1
+            return value
+
+    def put(self, key, value):
+        "Store ``value`` under ``key``, evicting the oldest entries."
+        if key is None or not self.maxsize:
+            return
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def resize(self, maxsize):
+        "Change the number of entries kept, evicting the oldest."
+        with self._lock:
+            self.maxsize = maxsize
+            while len(self._entries) > maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        "Drop all entries and reset the statistics."
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+class DiskCache:
+    """Parsed data stored on disk so it survives between builds.
+
+    Entries are keyed by a hash of the contents of the source file
+    and the loader settings, so they stay valid as long as the
+    content does, no matter how often the file is touched. Writes are
+    serialized with a lock per entry, so parallel workers that need
+    the same source wait for the first one to parse it instead of
+    repeating the work.
+
+    :param directory: Where to keep the entries, usually under the
+        doctree directory of the builder.
+    """
+
+    SUFFIX = ".pickle"
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def get_or_load(self, key, path, parse):
+        """Return the stored data for ``key``, calling ``parse`` on a miss.
+
+        :param key: Hashable key identifying the loader and options.
+        :param path: The file the data is parsed from.
+        :param parse: Callable without arguments returning the data.
+        """
+        path = os.path.abspath(path)
+        name = _key_digest(key, file_digest(path))
+        entry = os.path.join(self.directory, name + self.SUFFIX)
+        found, data = self._read(entry)
+        if not found:
+            with self._locked(name):
+                # Another process may have written the entry while we
+                # were waiting for the lock.
+                found, data = self._read(entry)
+                if not found:
+                    data = parse()
+                    self._write(entry, data)
+                    self._replace_reference(_key_digest(key, path), name)
+        if found:
+            self.hits += 1
+        else:
+            self.misses += 1
+        return data
+
+    def collect_garbage(self, max_age=DEFAULT_MAX_AGE):
+        """Remove entries that have not been used recently.
+
+        :param max_age: Number of days since the last use after which
+            an entry is removed.
+        """
+        cutoff = time.time() - max_age * 24 * 60 * 60
+        references = []
+        with os.scandir(self.directory) as it:
+            for dirent in it:
+                if dirent.name.endswith(".ref"):
+                    references.append(dirent.path)
+                    continue
+                if not dirent.name.endswith((self.SUFFIX, ".tmp")):
+                    # Locks are removed by their holder.
+                    continue
+                try:
+                    if dirent.stat().st_mtime < cutoff:
+                        os.unlink(dirent.path)
+                except FileNotFoundError:
+                    pass
+        # References are only read when their entry is written, so
+        # their age says nothing. Drop those left without an entry.
+        for ref in references:
+            with contextlib.suppress(OSError):
+                with open(ref, "r", encoding="ascii") as f:
+                    name = f.read().strip()
+                entry = os.path.join(self.directory, name + self.SUFFIX)
+                if not os.path.exists(entry):
+                    os.unlink(ref)
+
+    def _read(self, entry):
+        try:
+            with open(entry, "rb") as f:
+                data = pickle.load(f)
+        except FileNotFoundError:
+            return False, None
+        except _UNPICKLING_ERRORS:
+            # Truncated or corrupted.
+            with contextlib.suppress(OSError):
+                os.unlink(entry)
+            return False, None
+        # Record the use so garbage collection keeps the entry.
+        with contextlib.suppress(OSError):
+            os.utime(entry)
+        return True, data
+
+    def _write(self, entry, data):
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, entry)
+        except BaseException:
+            with contextlib.suppress(OSError):
+                os.unlink(tmp)
+            raise
+
+    def _replace_reference(self, ref_name, name):
+        # Remember which entry holds the current content of a source,
+        # and drop the entry for the content it replaced.
+        ref = os.path.join(self.directory, ref_name + ".ref")
+        with contextlib.suppress(OSError):
+            with open(ref, "r", encoding="ascii") as f:
+                previous = f.read().strip()
+            if previous and previous != name:
+                os.unlink(os.path.join(self.directory, previous + self.SUFFIX))
+        with open(ref, "w", encoding="ascii") as f:
+            f.write(name)
+
+    @contextlib.contextmanager
+    def _locked(self, name):
+        if fcntl is None:  # pragma: no cover
+            yield
+            return
+        lock = os.path.join(self.directory, name + ".lock")
+        with open(lock, "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                # Anyone opening the lock file after this point finds
+                # the entry already written when they check again.
+                with contextlib.suppress(OSError):
+                    os.unlink(lock)
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+class HandlePool:
+    """Open handles shared for the lifetime of a build.
+
+    Handles are keyed by path and opened on first use, so every
+    directive reading the same source shares one handle. A process
+    forked while handles are open does not use the handles of its
+    parent, and opens its own instead.
+
+    :param opener: Callable taking a path and returning a handle with
+        a ``close()`` method.
+    """
+
+    def __init__(self, opener):
+        self.opener = opener
+        self.opened = 0
+        self._handles = {}
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._handles)
+
+    def get(self, path):
+        """Return the handle for ``path``, opening it if needed.
+
+        :param path: The file to open.
+        """
+        path = os.path.abspath(path)
+        with self._lock:
+            self._check_pid()
+            handle = self._handles.get(path)
+            if handle is None:
+                handle = self._handles[path] = self.opener(path)
+                self.opened += 1
+            return handle
+
+    def close_all(self):
+        "Close all handles and reset the statistics."
+        with self._lock:
+            self._check_pid()
+            handles = list(self._handles.values())
+            self._handles.clear()
+            self.opened = 0
+        for handle in handles:
+            handle.close()
+
+    def _check_pid(self):
+        pid = os.getpid()
+        if pid != self._pid:
+            # Forked. Closing the inherited handles here could
+            # disturb the parent, so just forget about them.
+            self._handles = {}
+            self._pid = pid
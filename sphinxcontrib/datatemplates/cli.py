@@ -5,8 +5,6 @@ import io
 import os.path
 import pprint
 
-import jinja2
-
 from sphinxcontrib.datatemplates import helpers
 from sphinxcontrib.datatemplates import loaders
 
@@ -17,6 +15,15 @@ def main():
         "--config-file",
         help="the path to conf.py",
     )
+    parser.add_argument(
+        "--parser-backend",
+        action="append",
+        default=[],
+        help=(
+            "parser backend given as format:backend, for example yaml:libyaml "
+            "(defaults to the fastest safe one available)"
+        ),
+    )
     subparsers = parser.add_subparsers(
         title="commands",
         description="valid commands",
@@ -34,6 +41,10 @@ def main():
         default=[],
         help="options given as key:value passed through to loader and template",
     )
+    do_render.add_argument(
+        "--data-format",
+        help="the name of the loader to use instead of guessing from the source",
+    )
     do_render.add_argument(
         "template",
         help="the path to the template file",
@@ -55,6 +66,10 @@ def main():
         default=[],
         help="options given as key:value passed through to loader and template",
     )
+    do_dump.add_argument(
+        "--data-format",
+        help="the name of the loader to use instead of guessing from the source",
+    )
     do_dump.add_argument(
         "source",
         help="the path to the data file",
@@ -73,6 +88,16 @@ def main():
             config_body = f.read()
         exec(config_body, conf)
 
+    backends = dict(conf.get("datatemplates_parser_backends", {}))
+    for choice in args.parser_backend:
+        data_format, _, name = choice.partition(":")
+        backends[data_format] = name
+    try:
+        loaders.select_parser_backends(backends)
+    except ValueError as err:
+        print(err)
+        return 1
+
     return args.func(args, conf)
 
 
@@ -92,6 +117,8 @@ def _parse_options(options):
 
 
 def render(args, conf):
+    import jinja2
+
     conf.update(_parse_options(args.option))
     conf.update(
         {
@@ -101,7 +128,7 @@ def render(args, conf):
         }
     )
 
-    load = loaders.loader_for_source(args.source)
+    load = loaders.resolve_loader(args.source, args.data_format)
     if load is None:
         print("Could not find loader for {}".format(args.source))
         return 1
@@ -114,6 +141,9 @@ def render(args, conf):
         rendered = template.render(
             make_list_table=helpers.make_list_table,
             make_list_table_from_mappings=helpers.make_list_table_from_mappings,
+            # The output is text, so the tables are built as list-tables.
+            make_table=helpers.make_list_table,
+            make_table_from_mappings=helpers.make_list_table_from_mappings,
             data=data,
             **conf,
         )
@@ -126,7 +156,7 @@ def dump(args, conf):
         {"source": args.source, "absolute_resolved_path": os.path.abspath(args.source)}
     )
 
-    load = loaders.loader_for_source(args.source)
+    load = loaders.resolve_loader(args.source, args.data_format)
     if load is None:
         print("Could not find loader for {}".format(args.source))
         return 1
@@ -1,25 +1,45 @@
-import codecs
-import csv
-import json
-import mimetypes
+import contextlib
+import functools
+import hashlib
+import os
 from collections import defaultdict
 
-import defusedxml.ElementTree as ET
-import jinja2
-import yaml
 from docutils import nodes
 from docutils.parsers import rst
 from docutils.statemachine import ViewList
-from sphinx.jinja2glue import BuiltinTemplateLoader
+from sphinx import addnodes
 from sphinx.util import logging, import_object
 from sphinx.util.nodes import nested_parse_with_titles
-from sphinxcontrib.datatemplates import helpers, loaders
+from sphinxcontrib.datatemplates import cache, helpers, loaders, profiling, stats
 
 LOG = logging.getLogger(__name__)
 _default_templates = None
 
+# Inline templates compiled for the lifetime of a build.
+inline_templates = cache.TemplateCache()
+
+# Rendered output reused by directives with the same inputs, when
+# datatemplates_render_cache_size is set.
+rendered_templates = cache.LRUCache()
+
+# Nodes parsed from rendered output, reused by directives producing
+# the same output when datatemplates_doctree_cache_size is set.
+parsed_fragments = cache.LRUCache()
+
+# Loaders found by load() in templates, and the data it returned for
+# sources that are not files, for the rest of the build. Data parsed
+# from files is kept by the loaders in the byte-bounded data cache.
+resolved_loaders = cache.LRUCache(cache.DEFAULT_LOAD_CACHE_SIZE)
+loaded_sources = cache.LRUCache(cache.DEFAULT_LOAD_CACHE_SIZE)
+
+# Context values that differ between documents or read other sources.
+# Templates using them are rendered every time.
+_PER_DOCUMENT_NAMES = frozenset({"env", "load"})
+
 
 def _templates(builder):
+    from sphinx.jinja2glue import BuiltinTemplateLoader
+
     global _default_templates
 
     # Some builders have no templates manager at all, and some
@@ -43,6 +63,210 @@ def _templates(builder):
     return templates
 
 
+def _render_inline(templates, source, context):
+    from sphinx.jinja2glue import BuiltinTemplateLoader
+
+    # Only bypass render_string() when we know what it would do, so
+    # template bridges overriding it keep working.
+    if type(templates).render_string is not BuiltinTemplateLoader.render_string:
+        return templates.render_string(source, context)
+    template = inline_templates.get_or_compile(templates.environment, source)
+    return template.render(context)
+
+
+@functools.lru_cache(maxsize=256)
+def _analyze_template(environment, source):
+    # Return whether the template uses per-document values, and the
+    # names of the templates it includes, imports or extends. None
+    # stands for a name only known when rendering.
+    import jinja2.meta
+
+    ast = environment.parse(source)
+    uses_document = bool(
+        jinja2.meta.find_undeclared_variables(ast) & _PER_DOCUMENT_NAMES
+    )
+    return uses_document, tuple(jinja2.meta.find_referenced_templates(ast))
+
+
+def _resolve_templates(templates, name, source=None):
+    """Find the template files used to render a template.
+
+    Follows the templates it includes, imports or extends, and the
+    ones they use in turn. Returns a ``(filenames, fingerprint)``
+    tuple. ``fingerprint`` is a hash of all the sources, or ``None``
+    when the output of the template may differ between documents
+    with the same data and options, so it must not be reused.
+    Templates whose names are only known when rendering cannot be
+    followed.
+
+    :param templates: The templates manager of the builder.
+    :param name: The name of the template file, or ``None`` for an
+        inline template.
+    :param source: The source of an inline template.
+    """
+    import jinja2
+
+    environment = getattr(templates, "environment", None)
+    if environment is None:
+        # A template bridge we cannot look into.
+        return [], None
+    filenames = []
+    digest = hashlib.blake2b(digest_size=16)
+    shareable = True
+    pending = [(name, source, True)]
+    seen = {name}
+    while pending:
+        name, source, is_root = pending.pop()
+        if source is None:
+            try:
+                source, filename, _ = environment.loader.get_source(environment, name)
+            except jinja2.TemplateNotFound:
+                if is_root:
+                    raise
+                # Only one of a list of alternatives has to exist,
+                # and rendering reports the others.
+                continue
+            if filename:
+                filenames.append(filename)
+        digest.update(repr((name, source)).encode("utf-8"))
+        uses_document, references = _analyze_template(environment, source)
+        if uses_document:
+            shareable = False
+        for reference in references:
+            if reference is None:
+                shareable = False
+            elif reference not in seen:
+                seen.add(reference)
+                pending.append((reference, None, False))
+    return filenames, digest.hexdigest() if shareable else None
+
+
+# Nodes that are registered with the document or the environment
+# while parsing, so a copy would not be registered.
+_UNSHAREABLE_NODES = (
+    nodes.system_message,
+    nodes.pending,
+    nodes.target,
+    nodes.footnote_reference,
+    nodes.citation_reference,
+    nodes.substitution_reference,
+    addnodes.toctree,
+)
+_UNSHAREABLE_ATTRIBUTES = ("ids", "names", "refid", "refname", "backrefs")
+_DOCUMENT_REGISTRIES = (
+    "ids",
+    "nameids",
+    "refnames",
+    "refids",
+    "substitution_defs",
+    "substitution_refs",
+    "footnotes",
+    "citations",
+    "indirect_targets",
+)
+
+
+def _parse_state(document, env):
+    # Return a snapshot of what parsing may register outside the
+    # parsed nodes.
+    docname = env.docname
+    return (
+        tuple(len(getattr(document, name, ())) for name in _DOCUMENT_REGISTRIES),
+        len(document.transformer.transforms),
+        len(getattr(document.settings.record_dependencies, "list", ())),
+        len(env.dependencies.get(docname, ())),
+        len(env.included.get(docname, ())),
+        len(env.get_domain("datatemplate").sources.get(docname, ())),
+        dict(env.temp_data),
+        dict(env.ref_context),
+    )
+
+
+def _is_shareable(fragment):
+    for child in fragment:
+        for node in child.findall(nodes.Element):
+            if isinstance(node, _UNSHAREABLE_NODES):
+                return False
+            if any(node.get(name) for name in _UNSHAREABLE_ATTRIBUTES):
+                return False
+    return True
+
+
+def _detach(fragment):
+    # Return a copy of the nodes that keeps no reference to the
+    # document they were parsed in.
+    copies = [child.deepcopy() for child in fragment]
+    for copy in copies:
+        for node in copy.findall():
+            node._document = None
+    return copies
+
+
+def _copy_fragment(fragment, document, source, docname):
+    """Return a copy of cached nodes for use in another directive.
+
+    :param fragment: The ``(source, nodes)`` tuple from the cache.
+    :param document: The document the copy is inserted into.
+    :param source: The source name of the current directive.
+    :param docname: The name of the current document.
+    """
+    cached_source, cached_nodes = fragment
+    copies = [child.deepcopy() for child in cached_nodes]
+    for copy in copies:
+        copy.document = document
+        for node in copy.findall():
+            if node.source == cached_source:
+                node.source = source
+            if isinstance(node, nodes.Element) and "refdoc" in node:
+                node["refdoc"] = docname
+    return copies
+
+
+# Comment left in the output by make_table() for the table nodes.
+_TABLE_PLACEHOLDER = "datatemplate-table: {}"
+
+
+def _insert_tables(children, tables):
+    """Replace the placeholders of the tables built by the template.
+
+    :param children: The nodes parsed from the output.
+    :param tables: The tables, in the order they were built.
+    """
+    placeholders = {
+        _TABLE_PLACEHOLDER.format(index): table for index, table in enumerate(tables)
+    }
+    result = []
+    for child in children:
+        for comment in list(child.findall(nodes.comment)):
+            table = placeholders.get(comment.astext())
+            if table is None:
+                continue
+            table.source, table.line = comment.source, comment.line
+            if comment is child:
+                child = table
+            else:
+                comment.replace_self(table)
+        result.append(child)
+    return result
+
+
+def _relative_to(directory, path):
+    # Sphinx records dependencies relative to the source directory.
+    try:
+        return os.path.relpath(path, directory)
+    except ValueError:
+        # On another drive.
+        return path
+
+
+def _source_stamp(path):
+    try:
+        return cache.file_stamp(path)
+    except OSError:
+        # Sources that are not files, or missing ones.
+        return None
+
+
 def flag_true(argument):
     """
     Check for a valid flag option (no argument) and return ``True``.
@@ -86,6 +310,8 @@ class DataTemplateBase(rst.Directive):
         {
             "source": rst.directives.path,
             "template": rst.directives.path,
+            "no-cache": flag_true,
+            "profile": flag_true,
         },
     )
     has_content = True
@@ -98,6 +324,8 @@ class DataTemplateBase(rst.Directive):
         return {
             "make_list_table": helpers.make_list_table,
             "make_list_table_from_mappings": helpers.make_list_table_from_mappings,
+            "make_table": self._make_table,
+            "make_table_from_mappings": self._make_table_from_mappings,
             "escape_rst": helpers.escape_rst,
             "escape_rst_url": helpers.escape_rst_url,
             "data": data,
@@ -107,9 +335,78 @@ class DataTemplateBase(rst.Directive):
             "load": self._dynamic_load,
         }
 
+    def _add_table(self, table):
+        # Keep the nodes, and leave a comment where they go.
+        self._tables.append(table)
+        return ".. " + _TABLE_PLACEHOLDER.format(len(self._tables) - 1) + "\n"
+
+    def _make_table(self, headers, data, title="", columns=None):
+        try:
+            table = helpers.make_table(headers, data, title, columns)
+        except ValueError as err:
+            table = self._table_error(err)
+        return self._add_table(table)
+
+    def _make_table_from_mappings(self, headers, data, title, columns=None):
+        try:
+            table = helpers.make_table_from_mappings(headers, data, title, columns)
+        except ValueError as err:
+            table = self._table_error(err)
+        return self._add_table(table)
+
+    def _table_error(self, err):
+        # Shown in place of the table, like list-table errors.
+        return self.state_machine.reporter.error(
+            f"Error in table: {err}",
+            nodes.literal_block(self.block_text, self.block_text),
+            line=self.lineno,
+        )
+
+    def _render_key(self, fingerprint, source, absolute_resolved_path):
+        # Return the key of the rendered output in the render cache,
+        # or None if it must be rendered again.
+        if not rendered_templates.maxsize or fingerprint is None:
+            return None
+        if not source:
+            data = None
+        elif os.path.isfile(absolute_resolved_path):
+            data = cache.file_digest(absolute_resolved_path)
+        else:
+            # Directories and missing files.
+            return None
+        options = tuple(sorted((k, repr(v)) for k, v in self.options.items()))
+        return (self.loader, source, data, fingerprint, options)
+
+    def _fragment_key(self, env, rendered_template):
+        # Return the key of the parsed nodes in the doctree cache, or
+        # None if the output must be parsed again.
+        if not parsed_fragments.maxsize:
+            return None
+        # The roles and cross-references the output parses into also
+        # depend on the settings of the document.
+        default_domain = env.temp_data.get("default_domain")
+        return (
+            hashlib.blake2b(
+                rendered_template.encode("utf-8"), digest_size=16
+            ).hexdigest(),
+            env.temp_data.get("default_role"),
+            getattr(default_domain, "name", None),
+            repr(sorted(env.ref_context.items())),
+        )
+
+    def _note_dependency(self, env, relative_resolved_path, absolute_resolved_path):
+        # Let Sphinx compare modification times unless we can
+        # compare the contents.
+        if env.config.datatemplates_content_dependencies and os.path.isfile(
+            absolute_resolved_path
+        ):
+            env.get_domain("datatemplate").note_source(
+                env.docname, relative_resolved_path, absolute_resolved_path
+            )
+        else:
+            env.note_dependency(absolute_resolved_path)
+
     def _dynamic_load(self, source, data_format=None, **input_loader_options):
-        # FIXME: This does not work for dbm or other databases because
-        # the handle is closed.
         env = self.state.document.settings.env
         relative_resolved_path, absolute_resolved_path = env.relfn2path(source)
         # Only add a dependency if we were given an explicit
@@ -117,14 +414,18 @@ class DataTemplateBase(rst.Directive):
         # dependency, which is illegal. See
         # https://github.com/sphinx-contrib/datatemplates/pull/83
         if source:
-            env.note_dependency(absolute_resolved_path)
-
-        if data_format is not None:
-            loader = loaders.loader_by_name(data_format)
+            self._note_dependency(env, relative_resolved_path, absolute_resolved_path)
+
+        # Fall back to the loader of the directive only when guessing
+        # from the source name.
+        default = self.loader if data_format is None else None
+        loader_key = (source, data_format, default)
+        loader = resolved_loaders.get(loader_key)
+        if loader is None:
+            loader = loaders.resolve_loader(source, data_format, default=default)
             if loader is None:
                 raise ValueError("Could not find loader named {!r}".format(data_format))
-        else:
-            loader = loaders.loader_for_source(source, default=self.loader)
+            resolved_loaders.put(loader_key, loader)
 
         loader_options = {
             "source": source,
@@ -140,10 +441,32 @@ class DataTemplateBase(rst.Directive):
 
         loader_options.update(input_loader_options)
 
-        with loader(**loader_options) as data:
-            return data
+        if loader_options.get("no_cache"):
+            # Private handles stay open until the template is rendered.
+            return self._resources.enter_context(loader(**loader_options))
+        effective_options = sorted(
+            (k, v)
+            for k, v in loader_options.items()
+            if k not in ("source", "relative_resolved_path", "absolute_resolved_path")
+        )
+        key = (loader, absolute_resolved_path, repr(effective_options))
+        if _source_stamp(absolute_resolved_path) is not None:
+            # Loading a file again finds it in the data cache, which
+            # may have dropped it since, so it is not kept here.
+            key = None
+        data = loaded_sources.get(key)
+        if data is None:
+            # Without no-cache, what the loaders yield stays valid
+            # after leaving the context: parsed data, handles shared
+            # for the build, or readers opening the file on demand.
+            with loader(**loader_options) as data:
+                pass
+            loaded_sources.put(key, data)
+        return data
 
     def run(self):
+        import jinja2
+
         env = self.state.document.settings.env
         app = env.app
         builder = app.builder
@@ -169,14 +492,15 @@ class DataTemplateBase(rst.Directive):
         # dependency, which is illegal. See
         # https://github.com/sphinx-contrib/datatemplates/pull/83
         if source:
-            env.note_dependency(absolute_resolved_path)
+            self._note_dependency(env, relative_resolved_path, absolute_resolved_path)
 
+        templates = _templates(builder)
         if "template" in self.options:
             template = self.options["template"]
-            render_function = _templates(builder).render
+            render_function = templates.render
         else:
             template = "\n".join(self.content)
-            render_function = _templates(builder).render_string
+            render_function = functools.partial(_render_inline, templates)
 
         if not template:
             error = self.state_machine.reporter.error(
@@ -197,13 +521,62 @@ class DataTemplateBase(rst.Directive):
             )  # make identifier-compatible if trivially possible
             loader_options.setdefault(k, v)  # do not overwrite
 
+        domain = env.get_domain("datatemplate")
+        config = app.config
+        measure = stats.Measurement(
+            config.datatemplates_stats, config.datatemplates_stats_memory
+        )
+        data_bytes = None
+        parsed = 0
+        if self.options.get("profile") or profiling.matches(
+            config.datatemplates_profile, env.docname, source
+        ):
+            profiler = profiling.DirectiveProfiler()
+        else:
+            profiler = None
         try:
-            with self.loader(**loader_options) as data:
-                context = self._make_context(data, app.config, env)
-                rendered_template = render_function(
-                    template,
-                    context,
-                )
+            if "template" in self.options:
+                filenames, fingerprint = _resolve_templates(templates, template)
+            else:
+                filenames, fingerprint = _resolve_templates(templates, None, template)
+            # Render again when any of the templates change.
+            for filename in filenames:
+                self._note_dependency(env, _relative_to(env.srcdir, filename), filename)
+            if profiler is None:
+                key = self._render_key(fingerprint, source, absolute_resolved_path)
+            else:
+                # Always render what is profiled.
+                key = None
+            rendered_template = rendered_templates.get(key)
+            self._tables = []
+            if rendered_template is None:
+                # Also holds what load() opens while rendering.
+                parsed = loaders.parse_count()
+                with contextlib.ExitStack() as self._resources:
+                    if profiler is not None:
+                        self._resources.enter_context(profiler)
+                    with measure.phase("load"):
+                        data = self._resources.enter_context(
+                            self.loader(**loader_options)
+                        )
+                    if measure.enabled:
+                        data_bytes = cache.estimate_size(data)
+                    context = self._make_context(data, app.config, env)
+                    with measure.phase("render"):
+                        rendered_template = render_function(
+                            template,
+                            context,
+                        )
+                parsed = loaders.parse_count() - parsed
+                if self._tables:
+                    # The tables are not part of the output.
+                    key = None
+                rendered_templates.put(key, rendered_template)
+                outcome = "misses" if key is not None else "uncacheable"
+            else:
+                outcome = "hits"
+            if rendered_templates.maxsize:
+                domain.note_cache(env.docname, "render", outcome)
         except FileNotFoundError:
             error = self.state_machine.reporter.error(
                 f"Source file '{relative_resolved_path}' not found",
@@ -233,12 +606,53 @@ class DataTemplateBase(rst.Directive):
             )
             return [error]
 
+        if profiler is not None:
+            profiler.save(builder.outdir, env.docname, self.lineno)
+
+        with measure.phase("parse"):
+            children = self._parse(env, domain, rendered_template, source)
+            if self._tables:
+                children = _insert_tables(children, self._tables)
+        if measure.enabled:
+            domain.note_stats(
+                env.docname,
+                measure.record(
+                    docname=env.docname,
+                    lineno=self.lineno,
+                    directive=self.name,
+                    source=source,
+                    template=self.options.get("template"),
+                    lines=rendered_template.count("\n") + 1,
+                    data_bytes=data_bytes,
+                    parsed=parsed,
+                ),
+            )
+        return children
+
+    def _parse(self, env, domain, rendered_template, source):
+        # Return the nodes parsed from the rendered template.
+        document = self.state.document
+        fragment_key = self._fragment_key(env, rendered_template)
+        fragment = parsed_fragments.get(fragment_key)
+        if fragment is not None:
+            domain.note_cache(env.docname, "doctree", "hits")
+            return _copy_fragment(fragment, document, source, env.docname)
+
         result = ViewList()
         for line in rendered_template.splitlines():
             result.append(line, source)
         node = nodes.section()
-        node.document = self.state.document
+        node.document = document
+        if fragment_key is not None:
+            before = _parse_state(document, env)
         nested_parse_with_titles(self.state, result, node)
+        if fragment_key is not None:
+            if _parse_state(document, env) == before and _is_shareable(node.children):
+                parsed_fragments.put(fragment_key, (source, _detach(node.children)))
+                outcome = "misses"
+            else:
+                outcome = "uncacheable"
+            domain.note_cache(env.docname, "doctree", outcome)
         return node.children
 
     @classmethod
@@ -268,6 +682,11 @@ class DataTemplateNoData(DataTemplateBase):
 
             The name of a template file on the Sphinx template search path.
             Overrides directive body.
+
+        .. rst:directive:option:: profile: flag, optional
+
+            Set to profile loading the data and rendering the
+            template. See :confval:`datatemplates_profile`.
     """
 
     loader = staticmethod(loaders.load_nodata)
@@ -286,16 +705,81 @@ class DataTemplateJSON(DataTemplateWithEncoding):
             The name of a template file on the Sphinx template search path.
             Overrides directive body.
 
+        .. rst:directive:option:: profile: flag, optional
+
+            Set to profile loading the data and rendering the
+            template. See :confval:`datatemplates_profile`.
+
         .. rst:directive:option:: encoding: optional, defaults to ``utf-8-sig``
 
             The text encoding that will be used to read the source file.
             See :any:`standard-encodings`
+
+        .. rst:directive:option:: no-cache: flag, optional
+
+            Set to parse the source again instead of sharing the data
+            loaded by other directives during the build. Use this if
+            the template modifies ``data``.
     """
 
     loader = staticmethod(loaders.load_json)
 
 
+class DataTemplateJSONLines(DataTemplateBase):
+    """
+    .. rst:directive:: .. datatemplate:jsonl:: source-path
+
+        Load the `JSON Lines`_ file at ``source-path`` (relative to
+        the documentation build directory) and render using
+        ``template`` given in directive body.
+
+        ``data`` is an iterable of the records, parsed while the
+        template loops over them. It can be iterated over more than
+        once, but does not support :py:func:`len` or indexing.
+
+        .. _JSON Lines: https://jsonlines.org
+
+        .. rst:directive:option:: template: template name, optional
+
+            The name of a template file on the Sphinx template search path.
+            Overrides directive body.
+
+        .. rst:directive:option:: profile: flag, optional
+
+            Set to profile loading the data and rendering the
+            template. See :confval:`datatemplates_profile`.
+
+        .. rst:directive:option:: index-key: field name, optional
+
+            Build an index of the records by the value of this
+            field, so they can be looked up without reading the
+            whole file. ``data.get(value)`` returns the first record
+            with the value, ``data.get_all(value)`` all of them,
+            ``data.range(start, stop)`` the records with values from
+            ``start`` up to, but not including, ``stop`` in sorted
+            order, and ``data.keys()`` the sorted values. The index is
+            kept with the other cached data.
+
+        .. rst:directive:option:: no-cache: flag, optional
+
+            Set to build the index again instead of sharing the one
+            built by other directives during the build.
+    """
+
+    option_spec = defaultdict(
+        unchanged_factory,
+        DataTemplateBase.option_spec,
+        **{
+            "index-key": rst.directives.unchanged_required,
+        },
+    )
+
+    loader = staticmethod(loaders.load_jsonl)
+
+
 def _handle_dialect_option(argument):
+    import csv
+
     return rst.directives.choice(argument, ["auto"] + csv.list_dialects())
 
 
@@ -313,6 +797,11 @@ class DataTemplateCSV(DataTemplateWithEncoding):
             The name of a template file on the Sphinx template search path.
             Overrides directive body.
 
+        .. rst:directive:option:: profile: flag, optional
+
+            Set to profile loading the data and rendering the
+            template. See :confval:`datatemplates_profile`.
+
         .. rst:directive:option:: encoding: optional, defaults to ``utf-8-sig``
 
             The text encoding that will be used to read the source file.
@@ -328,6 +817,46 @@ class DataTemplateCSV(DataTemplateWithEncoding):
                 Set to select a specific :py:class:`csv.Dialect`.
                 Set to ``auto``, to try autodetection.
                 If not set the default dialect is used.
+
+        .. rst:directive:option:: stream: flag, optional
+
+                Set to read the rows while the template loops over
+                them instead of loading the whole file first. ``data``
+                can be iterated over more than once, but does not
+                support :py:func:`len` or indexing.
+                See :confval:`datatemplates_csv_stream_threshold`.
+
+        .. rst:directive:option:: columns: optional
+
+                Comma-separated list of the columns to keep. Use the
+                names from the header row with ``headers``, or
+                indexes starting from ``0`` without it. Other fields
+                are dropped while reading the file.
+
+        .. rst:directive:option:: where: optional
+
+                Comma-separated list of ``column=value`` or
+                ``column!=value`` conditions. Only rows matching all
+                of them are passed to the template. Separate
+                alternative values with ``|``, as in
+                ``family=X|Y``. Columns are given as for ``columns``
+                and do not have to be kept.
+
+        .. rst:directive:option:: rows: optional
+
+                Comma-separated list of the rows to read, given as
+                indexes (``0`` is the first row after the header,
+                ``-1`` the last one) or ranges like ``10000:10500``
+                or ``-100:``. Only the selected rows are parsed,
+                using an index of where the rows start in the file
+                that is built once and cached. Rows are counted
+                before applying ``where``.
+
+        .. rst:directive:option:: no-cache: flag, optional
+
+            Set to parse the source again instead of sharing the data
+            loaded by other directives during the build. Use this if
+            the template modifies ``data``.
     """
 
     option_spec = defaultdict(
@@ -336,6 +865,10 @@ class DataTemplateCSV(DataTemplateWithEncoding):
         **{
             "headers": flag_true,
             "dialect": _handle_dialect_option,
+            "stream": flag_true,
+            "columns": rst.directives.unchanged_required,
+            "where": rst.directives.unchanged_required,
+            "rows": rst.directives.unchanged_required,
         },
     )
 
@@ -357,6 +890,11 @@ class DataTemplateYAML(DataTemplateWithEncoding):
             The name of a template file on the Sphinx template search path.
             Overrides directive body.
 
+        .. rst:directive:option:: profile: flag, optional
+
+            Set to profile loading the data and rendering the
+            template. See :confval:`datatemplates_profile`.
+
         .. rst:directive:option:: encoding: optional, defaults to ``utf-8-sig``
 
             The text encoding that will be used to read the source file.
@@ -365,7 +903,22 @@ class DataTemplateYAML(DataTemplateWithEncoding):
         .. rst:directive:option:: multiple-documents: flag, optional
 
             Set to read multiple documents from the file into
-            a :py:class:`list`
+            a read-only :py:class:`list`. Each document is parsed
+            the first time it is used.
+
+        .. rst:directive:option:: documents: optional
+
+            Select documents from a file with multiple documents
+            without parsing the others. Give an index (``3`` or
+            ``-1``) to get a single document, a range (``2:5``) to
+            get a list, or ``key=value`` to get a list of the
+            documents whose top-level ``key`` has that value.
+
+        .. rst:directive:option:: no-cache: flag, optional
+
+            Set to parse the source again instead of sharing the data
+            loaded by other directives during the build. Use this if
+            the template modifies ``data``.
     """
 
     option_spec = defaultdict(
@@ -373,6 +926,7 @@ class DataTemplateYAML(DataTemplateWithEncoding):
         DataTemplateBase.option_spec,
         **{
             "multiple-documents": flag_true,
+            "documents": rst.directives.unchanged_required,
         },
     )
 
@@ -392,8 +946,44 @@ class DataTemplateXML(DataTemplateBase):
 
             The name of a template file on the Sphinx template search path.
             Overrides directive body.
+
+        .. rst:directive:option:: profile: flag, optional
+
+            Set to profile loading the data and rendering the
+            template. See :confval:`datatemplates_profile`.
+
+        .. rst:directive:option:: select: element path, optional
+
+            Stream the file and keep only the elements matching the
+            path instead of the whole tree. ``data`` is then a list
+            of the matching elements in document order. The path
+            supports tag names, ``*``, ``//`` to skip any number of
+            levels, and attribute predicates such as ``[@family]``
+            or ``[@family='X']``. Paths not starting with ``/`` are
+            relative to the root element.
+
+        .. rst:directive:option:: as-dict: flag, optional
+
+            Set to convert the elements to plain dictionaries with
+            the keys ``tag``, ``attrib``, ``text``, ``tail``, and
+            ``children``, which are faster to walk in templates.
+
+        .. rst:directive:option:: no-cache: flag, optional
+
+            Set to parse the source again instead of sharing the data
+            loaded by other directives during the build. Use this if
+            the template modifies ``data``.
     """
 
+    option_spec = defaultdict(
+        unchanged_factory,
+        DataTemplateBase.option_spec,
+        **{
+            "select": rst.directives.unchanged_required,
+            "as-dict": flag_true,
+        },
+    )
+
     loader = staticmethod(loaders.load_xml)
 
 
@@ -405,15 +995,84 @@ class DataTemplateDBM(DataTemplateBase):
         build directory)  via :py:func:`dbm.open` and render using
         ``template`` given in directive body.
 
+        The database is opened read-only once per build and shared by
+        all directives and ``load()`` calls using it. Besides the
+        usual read methods, ``data`` has ``prefetch(keys)``, which
+        returns a :py:class:`dict` with the values of many keys at
+        once, and ``sorted_keys()``.
+
         .. rst:directive:option:: template: template name, optional
 
                 The name of a template file on the Sphinx template search path.
                 Overrides directive body.
+
+        .. rst:directive:option:: profile: flag, optional
+
+            Set to profile loading the data and rendering the
+            template. See :confval:`datatemplates_profile`.
+
+        .. rst:directive:option:: no-cache: flag, optional
+
+                Set to open a separate handle that is closed once the
+                template has been rendered.
     """
 
     loader = staticmethod(loaders.load_dbm)
 
 
+class DataTemplateSQLite(DataTemplateBase):
+    """
+    .. rst:directive:: .. datatemplate:sqlite:: source-path
+
+        Open the SQLite database at ``source-path`` (relative to the
+        documentation build directory) read-only via :py:mod:`sqlite3`
+        and render using ``template`` given in directive body.
+
+        The connection is opened once per build and shared by all
+        directives and ``load()`` calls using the database. Without
+        ``query``, ``data`` has a ``query(sql, **params)`` method
+        returning rows.
+
+        .. rst:directive:option:: template: template name, optional
+
+            The name of a template file on the Sphinx template search path.
+            Overrides directive body.
+
+        .. rst:directive:option:: profile: flag, optional
+
+            Set to profile loading the data and rendering the
+            template. See :confval:`datatemplates_profile`.
+
+        .. rst:directive:option:: query: SQL, optional
+
+            The query selecting the rows. ``data`` is then an
+            iterable of :py:class:`sqlite3.Row` objects, fetched while
+            the template loops over them. Do the filtering, sorting,
+            and aggregation in the query instead of in the template.
+
+        .. rst:directive:option:: params: optional
+
+            Comma-separated list of ``name=value`` pairs giving the
+            values of named parameters (``:name``) in ``query``.
+
+        .. rst:directive:option:: no-cache: flag, optional
+
+            Set to open a separate connection that is closed once the
+            template has been rendered.
+    """
+
+    option_spec = defaultdict(
+        unchanged_factory,
+        DataTemplateBase.option_spec,
+        **{
+            "query": rst.directives.unchanged_required,
+            "params": rst.directives.unchanged_required,
+        },
+    )
+
+    loader = staticmethod(loaders.load_sqlite)
+
+
 class DataTemplateImportModule(DataTemplateBase):
     """
     .. rst:directive:: .. datatemplate:import-module:: module-name
@@ -426,6 +1085,11 @@ class DataTemplateImportModule(DataTemplateBase):
 
                 The name of a template file on the Sphinx template search path.
                 Overrides directive body.
+
+        .. rst:directive:option:: profile: flag, optional
+
+            Set to profile loading the data and rendering the
+            template. See :confval:`datatemplates_profile`.
     """
 
     loader = staticmethod(loaders.load_import_module)
@@ -442,6 +1106,9 @@ class DataTemplateLegacy(rst.Directive):
     has_content = False
 
     def _load_csv(self, filename, encoding):
+        import codecs
+        import csv
+
         try:
             if encoding is None:
                 f = open(filename, "r", newline="")
@@ -468,6 +1135,9 @@ class DataTemplateLegacy(rst.Directive):
             f.close()
 
     def _load_json(self, filename, encoding):
+        import codecs
+        import json
+
         try:
             if encoding is None:
                 f = open(filename, "r")
@@ -478,6 +1148,10 @@ class DataTemplateLegacy(rst.Directive):
             f.close()
 
     def _load_yaml(self, filename, encoding):
+        import codecs
+
+        import yaml
+
         try:
             if encoding is None:
                 f = open(filename, "r")
@@ -488,6 +1162,10 @@ class DataTemplateLegacy(rst.Directive):
             f.close()
 
     def _load_data(self, env, data_source, encoding):
+        import mimetypes
+
+        import defusedxml.ElementTree as ET
+
         rel_filename, filename = env.relfn2path(data_source)
         if data_source.endswith(".yaml"):
             return self._load_yaml(filename, encoding)
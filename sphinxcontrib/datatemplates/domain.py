@@ -1,5 +1,7 @@
+import os
+
 from sphinx.domains import Domain
-from . import directive
+from . import cache, directive
 
 
 class DataTemplateDomain(Domain):
@@ -8,12 +10,105 @@ class DataTemplateDomain(Domain):
     directives = {
         "nodata": directive.DataTemplateNoData,
         "json": directive.DataTemplateJSON,
+        "jsonl": directive.DataTemplateJSONLines,
         "yaml": directive.DataTemplateYAML,
         "csv": directive.DataTemplateCSV,
         "xml": directive.DataTemplateXML,
         "dbm": directive.DataTemplateDBM,
+        "sqlite": directive.DataTemplateSQLite,
         "import-module": directive.DataTemplateImportModule,
     }
+    initial_data = {"cache_stats": {}, "sources": {}, "stats": {}}
+
+    @property
+    def stats(self):
+        "Measurements of the directives, per document."
+        return self.data.setdefault("stats", {})
+
+    def note_stats(self, docname, record):
+        """Record the measurements of a directive in ``docname``.
+
+        :param record: A mapping of the values measured, see
+            :py:mod:`sphinxcontrib.datatemplates.stats`.
+        """
+        self.stats.setdefault(docname, []).append(record)
+
+    @property
+    def sources(self):
+        """Data sources read by the directives, per document.
+
+        Maps the path of each source, relative to the source
+        directory, to its size, modification time and digest.
+        """
+        return self.data.setdefault("sources", {})
+
+    def note_source(self, docname, relative_path, absolute_path):
+        """Record the current contents of a source used by ``docname``.
+
+        :param relative_path: The source, relative to the source
+            directory.
+        :param absolute_path: The absolute path of the source.
+        """
+        st = os.stat(absolute_path)
+        self.sources.setdefault(docname, {})[relative_path] = (
+            st.st_size,
+            st.st_mtime_ns,
+            cache.file_digest(absolute_path),
+        )
+
+    def changed_documents(self, srcdir, docnames):
+        """Return the documents with a source whose contents changed.
+
+        Sources with the recorded size and modification time are
+        assumed to be unchanged, the others are hashed again.
+
+        :param srcdir: The source directory.
+        :param docnames: The documents to check.
+        """
+        changed = []
+        for docname in docnames:
+            sources = self.sources.get(docname, {})
+            for relative_path, (size, mtime_ns, digest) in list(sources.items()):
+                path = os.path.join(srcdir, relative_path)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    changed.append(docname)
+                    break
+                if (st.st_size, st.st_mtime_ns) == (size, mtime_ns):
+                    continue
+                if st.st_size != size or cache.file_digest(path) != digest:
+                    changed.append(docname)
+                    break
+                # Only touched. Remember the new time so the file is
+                # not hashed again next time.
+                sources[relative_path] = (size, st.st_mtime_ns, digest)
+        return changed
+
+    @property
+    def cache_stats(self):
+        "Outcomes of the cache lookups made by the directives, per document."
+        # Environments pickled by older versions lack the entry.
+        return self.data.setdefault("cache_stats", {})
+
+    def note_cache(self, docname, cache, outcome):
+        """Count a cache lookup made by a directive in ``docname``.
+
+        :param cache: The name of the cache, ``"render"`` or ``"doctree"``.
+        :param outcome: ``"hits"``, ``"misses"`` or ``"uncacheable"``.
+        """
+        counts = self.cache_stats.setdefault(docname, {}).setdefault(
+            cache, {"hits": 0, "misses": 0, "uncacheable": 0}
+        )
+        counts[outcome] += 1
+
+    def cache_totals(self, cache):
+        "Return the outcomes for ``cache`` summed over all documents."
+        totals = {"hits": 0, "misses": 0, "uncacheable": 0}
+        for caches in self.cache_stats.values():
+            for outcome, count in caches.get(cache, {}).items():
+                totals[outcome] += count
+        return totals
 
     def get_objects(self):
         return []
@@ -24,5 +119,15 @@ class DataTemplateDomain(Domain):
     def resolve_any_xref(self, env, fromdocname, builder, target, node, contnode):
         return []
 
+    def clear_doc(self, docname):
+        for name in self.initial_data:
+            self.data.setdefault(name, {}).pop(docname, None)
+
     def merge_domaindata(self, docnames, otherdata):
-        pass
+        # Parallel reads record in the worker processes.
+        for name in self.initial_data:
+            data = self.data.setdefault(name, {})
+            other = otherdata.get(name, {})
+            for docname in docnames:
+                if docname in other:
+                    data[docname] = other[docname]
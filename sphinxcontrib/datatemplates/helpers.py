@@ -38,6 +38,86 @@ def make_list_table_from_mappings(headers, data, title, columns=None):
     return make_list_table(header_names, row_data, title, columns)
 
 
+def make_table(headers, data, title="", columns=None):
+    """Build a table without going through reStructuredText.
+
+    Takes the same arguments as :func:`make_list_table`, but builds the
+    nodes of the table directly instead of a ``list-table`` directive
+    to be parsed, which is much faster for large tables. The title and
+    cells hold their values as plain text, so they need no escaping but
+    cannot use inline markup.
+
+    Rows whose length does not match the headers, column widths that
+    do not match the headers, and tables without headers raise
+    :py:exc:`ValueError`, which a directive reports as an error.
+
+    The table is inserted in the document where the template calls
+    the function, which must be on a line of its own.
+
+    :param headers: List of header values.
+    :param data: Iterable of row data, yielding lists or tuples with rows.
+    :param title: Optional text to show as the table title.
+    :param columns: Optional widths for the columns.
+    """
+    from docutils import nodes
+
+    count = len(headers)
+    if not count:
+        raise ValueError("a table needs at least one column")
+    if columns:
+        widths = list(columns)
+        if len(widths) != count:
+            raise ValueError(
+                "got %d column widths for %d columns" % (len(widths), count)
+            )
+    else:
+        widths = [100 // count] * count
+
+    def make_row(values):
+        if len(values) != count:
+            raise ValueError(
+                "got a row of %d values for %d columns" % (len(values), count)
+            )
+        row = nodes.row()
+        for value in values:
+            text = "%s" % value
+            entry = nodes.entry()
+            if text:
+                entry += nodes.paragraph(text, text)
+            row += entry
+        return row
+
+    table = nodes.table()
+    if columns:
+        table["classes"].append("colwidths-given")
+    if title:
+        table += nodes.title(title, title)
+    tgroup = nodes.tgroup(cols=count)
+    table += tgroup
+    for width in widths:
+        tgroup += nodes.colspec(colwidth=width)
+    tgroup += nodes.thead("", make_row(headers))
+    tgroup += nodes.tbody("", *(make_row(row) for row in data))
+    return table
+
+
+def make_table_from_mappings(headers, data, title, columns=None):
+    """Build a table without going through reStructuredText.
+
+    Takes the same arguments as :func:`make_list_table_from_mappings`.
+    See :func:`make_table`.
+
+    :param headers: List of tuples containing header title and key value.
+    :param data: Iterable of row data, yielding mappings with rows.
+    :param title: Optional text to show as the table title.
+    :param columns: Optional widths for the columns.
+    """
+    header_names = [h[0] for h in headers]
+    header_keys = [h[1] for h in headers]
+    row_data = ([d.get(k) for k in header_keys] for d in data)
+    return make_table(header_names, row_data, title, columns)
+
+
 def escape_rst(s):
     """Escape string for inclusion in RST documents.
 
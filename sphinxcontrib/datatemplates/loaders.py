@@ -1,41 +1,216 @@
+import bisect
+import codecs
+import collections.abc
 import contextlib
-import csv
-import dbm
-import defusedxml.ElementTree as ET
+import functools
 import importlib
-import json
+import io
+import itertools
 import mimetypes
+import os
 import pathlib
-import yaml
+import re
+import threading
+
+from sphinxcontrib.datatemplates import cache
 
 registered_loaders = []
 
+# Parsed data shared by all directives for the lifetime of a build.
+data_cache = cache.DataCache()
+
+# Parsed data kept between builds, set up when the builder is ready.
+disk_cache = None
+
+# CSV files at least this many bytes long are always streamed.
+csv_stream_threshold = None
+
 
 class LoaderError(Exception):
     pass
 
 
+# Entry point group for loaders provided by other packages.
+PLUGIN_GROUP = "sphinxcontrib.datatemplates.loaders"
+
+
 class LoaderEntry:
-    def __init__(self, loader, name, match_source):
+    def __init__(
+        self,
+        loader,
+        name,
+        match_source,
+        extensions=(),
+        mimetype=None,
+        mimetype_fragment=None,
+    ):
         self.loader = loader
         self.name = name
         self.match_source = match_source
+        # Used to index the loader instead of calling match_source.
+        self.extensions = frozenset(e.lower() for e in extensions)
+        self.mimetype = mimetype
+        self.mimetype_fragment = mimetype_fragment
+
+
+class LoaderRegistry:
+    """Registered loaders, indexed by name, extension, and mimetype.
+
+    Resolving a source name gives the same result as trying each
+    loader in the order they were registered, but only the loaders
+    that can match are considered and the result is remembered.
+    Loaders from other packages are found through the
+    :py:data:`PLUGIN_GROUP` entry point group and imported the first
+    time a lookup is not answered by the loaders already registered.
+
+    :param entries: The list of :py:class:`LoaderEntry` objects.
+        Entries appended to it later are indexed on the next lookup.
+    :param group: The entry point group to load plugins from.
+    """
+
+    def __init__(self, entries, group=PLUGIN_GROUP):
+        self.entries = entries
+        self.group = group
+        self._indexed = None
+        self._plugins = None
+        self._resolved = {}
+        self._lock = threading.RLock()
+
+    def for_source(self, source):
+        """Return the loader for the named source, or ``None``.
+
+        :param source: The source name.
+        """
+        self._index()
+        try:
+            return self._resolved[source]
+        except KeyError:
+            pass
+        loader = self._match(source)
+        if loader is None and self._load_plugins():
+            self._index()
+            loader = self._match(source)
+        self._resolved[source] = loader
+        return loader
+
+    def by_name(self, name):
+        """Return the loader registered with the given name, or ``None``.
+
+        :param name: The loader name.
+        """
+        self._index()
+        pos = self._by_name.get(name)
+        if pos is None and self._load_plugins(name):
+            self._index()
+            pos = self._by_name.get(name)
+        return None if pos is None else self.entries[pos].loader
+
+    def _index(self):
+        with self._lock:
+            if self._indexed == len(self.entries):
+                return
+            self._by_name = {}
+            self._by_extension = {}
+            self._by_mimetype = {}
+            self._fragments = []
+            self._custom = []
+            for pos, entry in enumerate(self.entries):
+                if entry.match_source is None:
+                    continue
+                self._by_name.setdefault(entry.name, pos)
+                if entry.extensions:
+                    for ext in entry.extensions:
+                        self._by_extension.setdefault(ext, pos)
+                elif entry.mimetype:
+                    self._by_mimetype.setdefault(entry.mimetype, pos)
+                elif entry.mimetype_fragment:
+                    self._fragments.append((entry.mimetype_fragment, pos))
+                else:
+                    self._custom.append(pos)
+            self._resolved = {}
+            self._indexed = len(self.entries)
+
+    def _match(self, source):
+        # Collect the first candidate of each kind, then pick the one
+        # registered first.
+        candidates = []
+        pos = self._by_extension.get(pathlib.Path(source).suffix.lower())
+        if pos is not None:
+            candidates.append(pos)
+        if self._by_mimetype or self._fragments:
+            guess = mimetypes.guess_type(source)[0]
+            if guess:
+                pos = self._by_mimetype.get(guess)
+                if pos is not None:
+                    candidates.append(pos)
+                for fragment, pos in self._fragments:
+                    if fragment in guess:
+                        candidates.append(pos)
+                        break
+        for pos in self._custom:
+            if candidates and pos > min(candidates):
+                break
+            if self.entries[pos].match_source(source):
+                candidates.append(pos)
+                break
+        if not candidates:
+            return None
+        return self.entries[min(candidates)].loader
+
+    def _load_plugins(self, name=None):
+        # Import the plugins with the given name, or all of them.
+        # Returns whether anything was imported.
+        with self._lock:
+            if self._plugins is None:
+                import importlib.metadata
+
+                self._plugins = {
+                    ep.name: ep
+                    for ep in importlib.metadata.entry_points(group=self.group)
+                }
+            if name is None:
+                pending = list(self._plugins.values())
+                self._plugins.clear()
+            else:
+                pending = [self._plugins.pop(name)] if name in self._plugins else []
+        for ep in pending:
+            try:
+                # Importing the plugin registers its loaders.
+                ep.load()
+            except Exception as error:
+                raise LoaderError(
+                    f"could not load loader plugin {ep.name!r} from "
+                    f"{ep.value!r}: {error}"
+                ) from error
+        return bool(pending)
+
+
+registry = LoaderRegistry(registered_loaders)
 
 
 def loader_for_source(source, default=None):
     "Return the loader for the named source."
-    for e in registered_loaders:
-        if e.match_source is not None and e.match_source(source):
-            return e.loader
-    return default
+    loader = registry.for_source(source)
+    return default if loader is None else loader
 
 
 def loader_by_name(name, default=None):
     "Return the loader registered with the given name."
-    for e in registered_loaders:
-        if e.match_source is not None and e.name == name:
-            return e.loader
-    return default
+    loader = registry.by_name(name)
+    return default if loader is None else loader
+
+
+def resolve_loader(source, data_format=None, default=None):
+    """Return the loader for a source.
+
+    :param source: The source name, used to find the loader if
+        ``data_format`` is not given.
+    :param data_format: The name of the loader to use.
+    :param default: Returned if no loader is found.
+    """
+    if data_format is not None:
+        return loader_by_name(data_format, default)
+    return loader_for_source(source, default)
 
 
 def mimetype_loader(name, mimetype):
@@ -47,7 +222,7 @@ def mimetype_loader(name, mimetype):
             return False
         return guess == mimetype
 
-    return data_source_loader(name, check_mimetype)
+    return data_source_loader(name, check_mimetype, mimetype=mimetype)
 
 
 def lenient_mimetype_loader(name, mimetype_fragment):
@@ -59,41 +234,466 @@ def lenient_mimetype_loader(name, mimetype_fragment):
             return False
         return mimetype_fragment in guess
 
-    return data_source_loader(name, check_mimetype)
+    return data_source_loader(name, check_mimetype, mimetype_fragment=mimetype_fragment)
 
 
 def file_extension_loader(name, extensions):
     "A data loader for filenames ending with one of the given extensions."
+    extensions = frozenset(e.lower() for e in extensions)
 
     def check_ext(filename):
-        return pathlib.Path(filename).suffix.lower() in set(
-            e.lower() for e in extensions
-        )
+        return pathlib.Path(filename).suffix.lower() in extensions
 
-    return data_source_loader(name, check_ext)
+    return data_source_loader(name, check_ext, extensions=extensions)
 
 
-def data_source_loader(name, match_source=None):
+def data_source_loader(name, match_source=None, **index):
     """Add a named loader
 
     Add a named data loader with an optional function for matching to
-    source names.
+    source names. The keyword arguments of :py:class:`LoaderEntry`
+    describing what ``match_source`` matches can be given to find the
+    loader without calling it.
 
     """
 
     def wrap(loader_func):
-        registered_loaders.append(LoaderEntry(loader_func, name, match_source))
+        registered_loaders.append(LoaderEntry(loader_func, name, match_source, **index))
         return loader_func
 
     return wrap
 
 
+# Rough number of bytes the data parsed by each loader takes for each
+# byte of the file, used to account for it in the build-wide cache.
+# Other loaders, like the indexes, keep less than the file holds.
+_size_factors = {
+    "csv": 10,
+    "csv-rows": 10,
+    "json": 4,
+    "yaml": 6,
+    "yaml-stream": 4,
+    "xml": 10,
+}
+
+
+def cached_load(name, absolute_resolved_path, options, parse, no_cache=False):
+    """Return data parsed from a file, using the build-wide cache.
+
+    :param name: The name of the loader doing the parsing.
+    :param absolute_resolved_path: The file being parsed.
+    :param options: Hashable tuple of the loader options that change
+        the parsed result.
+    :param parse: Callable without arguments that parses the file.
+    :param no_cache: Set to bypass the cache.
+    """
+    if no_cache:
+        return parse()
+    path = os.path.abspath(absolute_resolved_path)
+    if disk_cache is not None:
+        parse = functools.partial(disk_cache.get_or_load, (name, options), path, parse)
+    return data_cache.get_or_load(
+        (name, path, options), path, parse, _size_factors.get(name, 1)
+    )
+
+
+def parse_count():
+    "Return the number of files parsed through the build-wide cache so far."
+    parsed = data_cache.misses
+    if disk_cache is not None:
+        # Misses of the data cache found on disk were not parsed.
+        parsed -= disk_cache.hits
+    return parsed
+
+
 @data_source_loader("nodata")
 @contextlib.contextmanager
 def load_nodata(source, **options):
     yield None
 
 
+def _sniff_csv_dialect(f):
+    import csv
+
+    sample = f.read(8192)
+    f.seek(0)
+    sniffer = csv.Sniffer()
+    return sniffer.sniff(sample)
+
+
+def _csv_reader(f, headers, dialect):
+    import csv
+
+    if headers:
+        if dialect is None:
+            return csv.DictReader(f)
+        return csv.DictReader(f, dialect=dialect)
+    if dialect is None:
+        return csv.reader(f)
+    return csv.reader(f, dialect=dialect)
+
+
+_CSV_CONDITION = re.compile(r"^(?P<column>.+?)\s*(?P<op>!=|=)\s*(?P<value>.*)$")
+
+
+def _split_option(value):
+    "Split a comma-separated option value into a tuple of strings."
+    if not value or value is True:
+        return ()
+    if isinstance(value, str):
+        value = value.split(",")
+    return tuple(v.strip() for v in value if v.strip())
+
+
+def _parse_csv_where(value):
+    conditions = []
+    for part in _split_option(value):
+        match = _CSV_CONDITION.match(part)
+        if not match:
+            raise LoaderError(
+                f"invalid condition {part!r}, expected column=value or column!=value"
+            )
+        # Sorted rather than a set, so the options have the same repr
+        # in every process and the disk cache finds their entries.
+        alternatives = tuple(sorted({v.strip() for v in match["value"].split("|")}))
+        conditions.append((match["column"], match["op"] == "=", alternatives))
+    return tuple(conditions)
+
+
+def _csv_rows(f, headers, dialect, columns=(), where=()):
+    """Return an iterator over the rows of an open CSV file.
+
+    Rows not matching all of the ``where`` conditions are skipped and
+    only the fields named in ``columns`` are kept, without building
+    the full row first.
+    """
+    if not columns and not where:
+        return _csv_reader(f, headers, dialect)
+    return _select_csv_rows(f, headers, dialect, columns, where)
+
+
+def _select_csv_rows(f, headers, dialect, columns, where):
+    return _select_csv_records(_csv_reader(f, False, dialect), headers, columns, where)
+
+
+def _select_csv_records(reader, headers, columns, where):
+    # reader yields the records as lists, including the header row.
+    if headers:
+        fieldnames = next(reader, [])
+        # Like csv.DictReader, the last of duplicate names wins.
+        positions = {name: i for i, name in enumerate(fieldnames)}
+    else:
+        fieldnames = None
+
+    def position(column):
+        if headers:
+            try:
+                return positions[column]
+            except KeyError:
+                raise LoaderError(f"unknown column {column!r}") from None
+        try:
+            return int(column)
+        except ValueError:
+            raise LoaderError(f"column {column!r} is not an index") from None
+
+    conditions = [(position(c), eq, values) for c, eq, values in where]
+    if columns:
+        names = columns
+        selected = [position(c) for c in columns]
+    elif headers:
+        names = fieldnames
+        selected = list(range(len(fieldnames)))
+    else:
+        selected = None
+
+    def matches(row):
+        for i, eq, values in conditions:
+            cell = row[i] if i < len(row) else None
+            if (cell in values) != eq:
+                return False
+        return True
+
+    for row in reader:
+        if headers and not row:
+            # csv.DictReader skips blank lines
+            continue
+        if conditions and not matches(row):
+            continue
+        if selected is None:
+            yield row
+            continue
+        cells = [row[i] if i < len(row) else None for i in selected]
+        if not headers:
+            yield cells
+            continue
+        record = dict(zip(names, cells))
+        if not columns and len(row) > len(fieldnames):
+            # Like csv.DictReader, keep the extra fields under None.
+            record[None] = row[len(fieldnames) :]
+        yield record
+
+
+_CSV_LINE_END = re.compile(rb"\r\n|\r|\n")
+
+
+def _csv_dialect_params(dialect):
+    import csv
+
+    if dialect is None:
+        return csv.get_dialect("excel")
+    if isinstance(dialect, str):
+        return csv.get_dialect(dialect)
+    return dialect
+
+
+def _csv_can_index(params, encoding):
+    # The index is built by looking for line ends and quote characters
+    # in the raw bytes. An escape character can hide a quote, and in
+    # most multibyte encodings the bytes of those characters can also
+    # appear inside other characters.
+    if params.escapechar is not None:
+        return False
+    name = codecs.lookup(encoding).name
+    return name in {"utf-8", "utf-8-sig", "ascii", "latin-1", "cp1252"} or (
+        name.startswith("iso8859")
+    )
+
+
+def _csv_open_quote(line, in_quotes, params):
+    """Return whether a quoted field is still open at the end of ``line``.
+
+    Follows :py:mod:`csv`: a quote character only opens a field at its
+    start, and elsewhere is part of the value.
+
+    :param line: The bytes of the line, without the line end.
+    :param in_quotes: Whether a quoted field was open before the line.
+    :param params: ``(quote, delimiter, doublequote, skipinitialspace)``,
+        with the characters encoded like the file.
+    """
+    quote, delimiter, doublequote, skip_spaces = params
+    if quote not in line:
+        return in_quotes
+    at_start = not in_quotes
+    i = 0
+    end = len(line)
+    while i < end:
+        if in_quotes:
+            i = line.find(quote, i)
+            if i < 0:
+                return True
+            i += len(quote)
+            if doublequote and line.startswith(quote, i):
+                i += len(quote)
+                continue
+            in_quotes = False
+        elif at_start:
+            if line.startswith(quote, i):
+                in_quotes = True
+                i += len(quote)
+            elif skip_spaces and line.startswith(b" ", i):
+                i += 1
+            else:
+                at_start = False
+        else:
+            i = line.find(delimiter, i)
+            if i < 0:
+                return False
+            i += len(delimiter)
+            at_start = True
+    return in_quotes
+
+
+def _index_csv_records(path, quoting, skip_blank):
+    """Return the byte offsets of the records in a CSV file.
+
+    The result has one offset for the start of each record, followed
+    by the size of the file. Line ends inside quoted fields do not
+    end a record. With ``skip_blank``, blank lines are not counted as
+    records, like :py:class:`csv.DictReader` does.
+
+    :param quoting: The arguments of :py:func:`_csv_open_quote`
+        describing the quoting of the dialect, or None when quotes are
+        not special.
+    """
+    import array
+    import mmap
+
+    offsets = array.array("Q")
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                start = 0
+                line_start = 0
+                in_quotes = False
+                for match in _CSV_LINE_END.finditer(mm):
+                    if quoting is not None:
+                        in_quotes = _csv_open_quote(
+                            mm[line_start : match.start()], in_quotes, quoting
+                        )
+                    line_start = match.end()
+                    if in_quotes:
+                        continue
+                    if not (skip_blank and match.start() == start):
+                        offsets.append(start)
+                    start = line_start
+                if start < size:
+                    offsets.append(start)
+    offsets.append(size)
+    return offsets
+
+
+def _parse_csv_rows_option(value):
+    """Parse the ``rows`` option into a tuple of ``(start, stop)`` pairs."""
+    ranges = []
+    for part in _split_option(value):
+        try:
+            if ":" in part:
+                bounds = [int(b) if b.strip() else None for b in part.split(":")]
+                if len(bounds) != 2:
+                    raise ValueError(part)
+                ranges.append(tuple(bounds))
+            else:
+                index = int(part)
+                ranges.append((index, index + 1 or None))
+        except ValueError:
+            raise LoaderError(
+                f"invalid rows selection {part!r}, expected an index "
+                "or a range like 10:20"
+            ) from None
+    return tuple(ranges)
+
+
+def _csv_row_slices(path, headers, dialect, encoding, rows, no_cache):
+    """Return the header and the raw records selected by ``rows``.
+
+    Uses an index of the record offsets to parse only the selected
+    records when the dialect and encoding allow it.
+    """
+    import csv
+
+    if dialect == "auto":
+        with open(path, "r", newline="", encoding=encoding) as f:
+            dialect = _sniff_csv_dialect(f)
+    params = _csv_dialect_params(dialect)
+
+    if not _csv_can_index(params, encoding):
+        with open(path, "r", newline="", encoding=encoding) as f:
+            records = list(_csv_reader(f, False, dialect))
+        header = None
+        if headers:
+            records = [r for r in records if r]
+            header = records.pop(0) if records else []
+        selected = []
+        for start, stop in rows:
+            selected.extend(records[start:stop])
+        return header, selected
+
+    if params.quotechar and params.quoting != csv.QUOTE_NONE:
+        # Encoded like the file, without a byte order mark.
+        codec = (
+            "utf-8" if codecs.lookup(encoding).name.startswith("utf-8") else encoding
+        )
+        quoting = (
+            params.quotechar.encode(codec),
+            params.delimiter.encode(codec),
+            bool(params.doublequote),
+            bool(params.skipinitialspace),
+        )
+    else:
+        quoting = None
+    offsets = cached_load(
+        "csv-index",
+        path,
+        (quoting, bool(headers)),
+        functools.partial(_index_csv_records, path, quoting, bool(headers)),
+        no_cache,
+    )
+
+    def parse(f, first, last):
+        f.seek(offsets[first])
+        text = f.read(offsets[last] - offsets[first]).decode(encoding)
+        return list(_csv_reader(io.StringIO(text, newline=""), False, dialect))
+
+    header = None
+    skip = 0
+    count = len(offsets) - 1
+    selected = []
+    with open(path, "rb") as f:
+        if headers:
+            skip = 1
+            count = max(count - 1, 0)
+            header = parse(f, 0, 1)[0] if len(offsets) > 1 else []
+        for start, stop in rows:
+            first, last, _ = slice(start, stop).indices(count)
+            if first < last:
+                selected.extend(parse(f, first + skip, last + skip))
+    return header, selected
+
+
+class CSVRows:
+    """Rows of a CSV file, read on demand.
+
+    Every iteration reads the file again from the start, so the rows
+    can be looped over more than once without keeping them in
+    memory. The file is only open while an iteration is in progress.
+
+    :param path: The CSV file.
+    :param headers: Set to produce mappings using
+        :py:class:`csv.DictReader` instead of lists.
+    :param dialect: The :py:class:`csv.Dialect` to use, or ``"auto"``
+        to sniff it from the start of the file.
+    :param encoding: The text encoding of the file.
+    :param columns: Names, or indexes without ``headers``, of the
+        fields to keep.
+    :param where: Conditions rows must match, as parsed from the
+        ``where`` option.
+    """
+
+    def __init__(
+        self,
+        path,
+        headers=False,
+        dialect=None,
+        encoding="utf-8-sig",
+        columns=(),
+        where=(),
+    ):
+        self.path = path
+        self.headers = headers
+        self.encoding = encoding
+        self.columns = columns
+        self.where = where
+        if dialect == "auto":
+            with self._open() as f:
+                dialect = _sniff_csv_dialect(f)
+        self.dialect = dialect
+        self._files = set()
+
+    def __repr__(self):
+        return f"<{type(self).__name__} {os.fspath(self.path)!r}>"
+
+    def __iter__(self):
+        f = self._open()
+        self._files.add(f)
+        try:
+            yield from _csv_rows(
+                f, self.headers, self.dialect, self.columns, self.where
+            )
+        finally:
+            self._files.discard(f)
+            f.close()
+
+    def close(self):
+        "Close the file of any iteration still in progress."
+        for f in list(self._files):
+            f.close()
+        self._files.clear()
+
+    def _open(self):
+        return open(self.path, "r", newline="", encoding=self.encoding)
+
+
 @file_extension_loader("csv", [".csv"])
 @contextlib.contextmanager
 def load_csv(
@@ -102,36 +702,560 @@ def load_csv(
     headers=False,
     dialect=None,
     encoding="utf-8-sig",
+    stream=False,
+    columns=None,
+    where=None,
+    rows=None,
+    no_cache=False,
     **options,
 ):
-    with open(absolute_resolved_path, "r", newline="", encoding=encoding) as f:
-        if dialect == "auto":
-            sample = f.read(8192)
-            f.seek(0)
-            sniffer = csv.Sniffer()
-            dialect = sniffer.sniff(sample)
-        if headers:
-            if dialect is None:
-                r = csv.DictReader(f)
-            else:
-                r = csv.DictReader(f, dialect=dialect)
-        else:
-            if dialect is None:
-                r = csv.reader(f)
-            else:
-                r = csv.reader(f, dialect=dialect)
-        yield list(r)
+    columns = _split_option(columns)
+    where = _parse_csv_where(where)
+    rows = _parse_csv_rows_option(rows)
+    if rows:
+
+        def parse():
+            header, records = _csv_row_slices(
+                absolute_resolved_path, headers, dialect, encoding, rows, no_cache
+            )
+            if headers:
+                records = itertools.chain([header], records)
+            return list(_select_csv_records(records, headers, columns, where))
+
+        yield cached_load(
+            "csv-rows",
+            absolute_resolved_path,
+            (bool(headers), dialect, encoding, columns, where, rows),
+            parse,
+            no_cache,
+        )
+        return
+    if not stream and csv_stream_threshold is not None:
+        stream = os.path.getsize(absolute_resolved_path) >= csv_stream_threshold
+    if stream:
+        rows = CSVRows(
+            absolute_resolved_path, headers, dialect, encoding, columns, where
+        )
+        try:
+            yield rows
+        finally:
+            rows.close()
+        return
+
+    def parse():
+        with open(absolute_resolved_path, "r", newline="", encoding=encoding) as f:
+            csv_dialect = dialect
+            if csv_dialect == "auto":
+                csv_dialect = _sniff_csv_dialect(f)
+            return list(_csv_rows(f, headers, csv_dialect, columns, where))
+
+    yield cached_load(
+        "csv",
+        absolute_resolved_path,
+        (bool(headers), dialect, encoding, columns, where),
+        parse,
+        no_cache,
+    )
+
+
+def _stdlib_json_backend():
+    import json
+
+    return json.loads
+
+
+def _orjson_backend():
+    import orjson
+
+    return orjson.loads
+
+
+def _libyaml_backend():
+    import yaml
+
+    return yaml.CSafeLoader  # AttributeError without libyaml
+
+
+def _python_yaml_backend():
+    import yaml
+
+    return yaml.SafeLoader
+
+
+# Parser backends available for each format, in the order "auto"
+# tries them. The factories return what the loader for the format
+# needs to parse, or raise ImportError or AttributeError if the
+# backend is missing. orjson is only used when chosen: it turns
+# integers beyond 64 bits into floats.
+parser_backends = {
+    "json": {"stdlib": _stdlib_json_backend, "orjson": _orjson_backend},
+    "yaml": {"libyaml": _libyaml_backend, "python": _python_yaml_backend},
+}
+
+# Backends whose results and errors the others must match.
+_reference_backends = {"json": "stdlib", "yaml": "python"}
+
+_backend_choices = {}
+_active_backends = {}
+
+
+def select_parser_backends(choices):
+    """Choose the parser backend to use for each format.
+
+    :param choices: Mapping of format names to backend names. Formats
+        not listed, or set to ``"auto"``, use the fastest backend
+        available.
+    """
+    for data_format, name in choices.items():
+        if data_format not in parser_backends:
+            raise ValueError(f"no parser backends for format {data_format!r}")
+        if name != "auto" and name not in parser_backends[data_format]:
+            raise ValueError(
+                f"unknown {data_format} parser backend {name!r}, expected one "
+                f"of {', '.join(['auto', *parser_backends[data_format]])}"
+            )
+    _backend_choices.clear()
+    _backend_choices.update(choices)
+    _active_backends.clear()
+
+
+def parser_backend(data_format):
+    """Return the name and implementation of the backend for a format.
+
+    The selected backend is used if it is available, otherwise the
+    fastest one that is.
+
+    :param data_format: The name of the format, like ``"json"``.
+    """
+    try:
+        return _active_backends[data_format]
+    except KeyError:
+        pass
+    available = parser_backends[data_format]
+    choice = _backend_choices.get(data_format, "auto")
+    names = list(available)
+    if choice in available:
+        names.remove(choice)
+        names.insert(0, choice)
+    for name in names:
+        try:
+            implementation = available[name]()
+        except (ImportError, AttributeError):
+            continue
+        _active_backends[data_format] = (name, implementation)
+        return name, implementation
+    raise LoaderError(f"no {data_format} parser backend is available")
+
+
+def parse_with_backend(data_format, parse, errors):
+    """Parse with the backend for a format.
+
+    Input the backend rejects is parsed again with the reference
+    backend, so what is accepted and the errors reported do not depend
+    on the backends installed.
+
+    :param data_format: The name of the format, like ``"json"``.
+    :param parse: Callable taking the implementation of the backend.
+    :param errors: The exceptions raised for input the backend rejects.
+    """
+    name, implementation = parser_backend(data_format)
+    reference = _reference_backends[data_format]
+    if name == reference:
+        return parse(implementation)
+    try:
+        return parse(implementation)
+    except errors:
+        pass
+    return parse(parser_backends[data_format][reference]())
 
 
 @mimetype_loader("json", "application/json")
 @contextlib.contextmanager
-def load_json(source, absolute_resolved_path, encoding="utf-8-sig", **options):
-    with open(absolute_resolved_path, "r", encoding=encoding) as f:
+def load_json(
+    source,
+    absolute_resolved_path,
+    encoding="utf-8-sig",
+    no_cache=False,
+    **options,
+):
+    import json
+
+    def read(loads):
+        with open(absolute_resolved_path, "r", encoding=encoding) as f:
+            return loads(f.read())
+
+    def parse():
         try:
-            yield json.load(f)
+            return parse_with_backend("json", read, ValueError)
         except json.decoder.JSONDecodeError as error:
             raise LoaderError(str(error)) from error
 
+    yield cached_load("json", absolute_resolved_path, (encoding,), parse, no_cache)
+
+
+def _jsonl_lines(f):
+    # Yield (line number, offset, line) for the non-blank lines.
+    offset = 0
+    for lineno, line in enumerate(f, 1):
+        if lineno == 1 and line.startswith(codecs.BOM_UTF8):
+            offset = len(codecs.BOM_UTF8)
+            line = line[offset:]
+        if line.strip():
+            yield lineno, offset, line
+        offset += len(line)
+
+
+def _jsonl_record(path, line, lineno=None, offset=None):
+    try:
+        return parse_with_backend("json", lambda loads: loads(line), ValueError)
+    except ValueError as error:
+        # Invalid JSON, or bytes that are not UTF-8.
+        where = f"line {lineno}" if lineno is not None else f"offset {offset}"
+        raise LoaderError(f"{os.fspath(path)}, {where}: {error}") from error
+
+
+def _index_jsonl(path, key):
+    """Return the sorted values of ``key`` and the offsets of their records.
+
+    Records without the key are left out.
+    """
+    entries = []
+    with open(path, "rb") as f:
+        for lineno, offset, line in _jsonl_lines(f):
+            record = _jsonl_record(path, line, lineno=lineno)
+            if isinstance(record, dict) and key in record:
+                entries.append((record[key], offset))
+    try:
+        entries.sort(key=lambda entry: entry[0])
+    except TypeError as error:
+        raise LoaderError(
+            f"values of index key {key!r} cannot be compared: {error}"
+        ) from error
+    return [entry[0] for entry in entries], [entry[1] for entry in entries]
+
+
+class JSONLines:
+    """Records of a JSON Lines file, parsed on demand.
+
+    Every iteration reads the file again from the start, so the
+    records can be looped over more than once without keeping them in
+    memory. With an index, records can also be looked up by the value
+    of the indexed field without reading the rest of the file.
+
+    :param path: The JSON Lines file.
+    :param index_key: The field the index was built for.
+    :param index: The index built by :py:func:`_index_jsonl`.
+    """
+
+    def __init__(self, path, index_key=None, index=None):
+        self.path = path
+        self.index_key = index_key
+        self._index = index
+
+    def __repr__(self):
+        return f"<{type(self).__name__} {os.fspath(self.path)!r}>"
+
+    def __iter__(self):
+        with open(self.path, "rb") as f:
+            for lineno, _, line in _jsonl_lines(f):
+                yield _jsonl_record(self.path, line, lineno=lineno)
+
+    def __contains__(self, key):
+        keys, _ = self._require_index()
+        i = bisect.bisect_left(keys, key)
+        return i < len(keys) and keys[i] == key
+
+    def keys(self):
+        "Return the distinct values of the index key in sorted order."
+        keys, _ = self._require_index()
+        return list(dict.fromkeys(keys))
+
+    def get(self, key, default=None):
+        """Return the first record with ``key`` as the indexed value.
+
+        :param key: The value to look up.
+        :param default: Returned if no record has the value.
+        """
+        for record in self.get_all(key):
+            return record
+        return default
+
+    def get_all(self, key):
+        """Return all records with ``key`` as the indexed value.
+
+        :param key: The value to look up.
+        """
+        keys, offsets = self._require_index()
+        start = bisect.bisect_left(keys, key)
+        stop = bisect.bisect_right(keys, key, lo=start)
+        return list(self._read(offsets[start:stop]))
+
+    def range(self, start=None, stop=None):
+        """Yield the records with indexed values from ``start`` to ``stop``.
+
+        The records are ordered by the indexed value. ``stop`` is
+        excluded, like for :py:func:`range`.
+
+        :param start: The lowest value to include, or ``None``.
+        :param stop: The first value to exclude, or ``None``.
+        """
+        keys, offsets = self._require_index()
+        lo = 0 if start is None else bisect.bisect_left(keys, start)
+        hi = len(keys) if stop is None else bisect.bisect_left(keys, stop, lo=lo)
+        return self._read(offsets[lo:hi])
+
+    def _read(self, offsets):
+        with open(self.path, "rb") as f:
+            for offset in offsets:
+                f.seek(offset)
+                yield _jsonl_record(self.path, f.readline(), offset=offset)
+
+    def _require_index(self):
+        if self._index is None:
+            raise LoaderError("looking up records requires the index-key option")
+        return self._index
+
+
+@file_extension_loader("jsonl", [".jsonl", ".ndjson"])
+@contextlib.contextmanager
+def load_jsonl(
+    source,
+    absolute_resolved_path,
+    index_key=None,
+    no_cache=False,
+    **options,
+):
+    index = None
+    if index_key:
+        index = cached_load(
+            "jsonl-index",
+            absolute_resolved_path,
+            (index_key,),
+            functools.partial(_index_jsonl, absolute_resolved_path, index_key),
+            no_cache,
+        )
+    yield JSONLines(absolute_resolved_path, index_key, index)
+
+
+def _rename_yaml_mark(mark, name, line_offset=0):
+    import yaml
+
+    # Marks from libyaml are read-only, so build a new one.
+    return yaml.error.Mark(
+        name,
+        mark.index,
+        mark.line + line_offset,
+        mark.column,
+        getattr(mark, "buffer", None),
+        getattr(mark, "pointer", None),
+    )
+
+
+def _yaml_loader_error(error, source, stream_name, line_offset=0):
+    if error.context_mark is not None and error.context_mark.name == stream_name:
+        error.context_mark = _rename_yaml_mark(error.context_mark, source, line_offset)
+    if error.problem_mark is not None:
+        error.problem_mark = _rename_yaml_mark(error.problem_mark, source, line_offset)
+    return LoaderError(str(error))
+
+
+def _is_yaml_marker(line, marker):
+    return line.startswith(marker) and line[3:4] in (b"", b" ", b"\t", b"\r", b"\n")
+
+
+def _index_yaml_documents(path):
+    """Find where each document of a YAML stream starts and ends.
+
+    Returns a list of ``(start, end, first_line)`` tuples with the byte
+    offsets of the documents and the line number each starts on. Only
+    the document markers at the start of lines are looked at, which
+    the YAML specification does not allow inside of content.
+    """
+    spans = []
+    start = start_line = 0
+    has_content = False
+    directives = None  # (offset, line) of directives for the next document
+    offset = 0
+    with open(path, "rb") as f:
+        for lineno, raw in enumerate(f):
+            line = raw
+            if lineno == 0 and line.startswith(codecs.BOM_UTF8):
+                line = line[len(codecs.BOM_UTF8) :]
+            if _is_yaml_marker(line, b"---"):
+                if has_content:
+                    end = directives[0] if directives else offset
+                    spans.append((start, end, start_line))
+                if directives:
+                    start, start_line = directives
+                elif has_content or not spans:
+                    start, start_line = offset, lineno
+                has_content = True
+                directives = None
+            elif _is_yaml_marker(line, b"..."):
+                if has_content:
+                    spans.append((start, offset + len(raw), start_line))
+                has_content = False
+                directives = None
+                start, start_line = offset + len(raw), lineno + 1
+            elif line.startswith(b"%") and not has_content:
+                if directives is None:
+                    directives = (offset, lineno)
+            elif line.strip() and not line.lstrip().startswith(b"#"):
+                has_content = True
+            offset += len(raw)
+    if has_content:
+        spans.append((start, offset, start_line))
+    return spans
+
+
+class _YAMLStream:
+    # The documents of one YAML file, parsed on first access and
+    # shared by all of the YAMLDocuments views of the file.
+
+    _unparsed = object()
+
+    def __init__(self, source, path, encoding, spans=None, documents=None):
+        self.source = source
+        self.path = path
+        self.encoding = encoding
+        self.spans = spans
+        if documents is None:
+            documents = [self._unparsed] * len(spans)
+        self.documents = documents
+        self._size = os.path.getsize(path)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.documents)
+
+    def __sizeof__(self):
+        # What the documents will take once they have all been parsed,
+        # roughly, so the data cache accounts for them up front.
+        return object.__sizeof__(self) + 4 * self._size
+
+    def text(self, index):
+        start, end, _ = self.spans[index]
+        with open(self.path, "rb") as f:
+            f.seek(start)
+            raw = f.read(end - start)
+        return raw.decode(self.encoding)
+
+    def document(self, index):
+        document = self.documents[index]
+        if document is self._unparsed:
+            with self._lock:
+                document = self.documents[index]
+                if document is self._unparsed:
+                    document = self._parse(index)
+                    self.documents[index] = document
+        return document
+
+    def _parse(self, index):
+        import yaml
+
+        text = self.text(index)
+
+        def read(yaml_loader):
+            # The span holds exactly one document, or none at all if
+            # it only has an explicit end marker.
+            return next(yaml.load_all(text, Loader=yaml_loader), None)
+
+        try:
+            return parse_with_backend("yaml", read, yaml.YAMLError)
+        except yaml.error.MarkedYAMLError as error:
+            raise _yaml_loader_error(
+                error, self.source, "<unicode string>", self.spans[index][2]
+            ) from error
+
+
+class YAMLDocuments(collections.abc.Sequence):
+    """Documents of a multi-document YAML file, parsed on access.
+
+    Behaves like a read-only :py:class:`list` of the documents. Only
+    the documents that are actually used are parsed, and each of them
+    only once per build.
+    """
+
+    def __init__(self, stream, indexes):
+        self._stream = stream
+        self._indexes = indexes
+
+    def __len__(self):
+        return len(self._indexes)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return YAMLDocuments(self._stream, self._indexes[index])
+        return self._stream.document(self._indexes[index])
+
+    def __eq__(self, other):
+        if isinstance(other, collections.abc.Sequence) and not isinstance(
+            other, (str, bytes)
+        ):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self):
+        return f"<{type(self).__name__} {self._stream.source!r} {len(self)} documents>"
+
+
+def _parse_yaml_documents_option(value):
+    # Return an int, a slice, or a (key, value) tuple.
+    value = str(value).strip()
+    if "=" in value:
+        key, _, expected = value.partition("=")
+        return (key.strip(), expected.strip())
+    try:
+        if ":" in value:
+            parts = [int(p) if p.strip() else None for p in value.split(":")]
+            if len(parts) > 3:
+                raise ValueError(value)
+            return slice(*parts)
+        return int(value)
+    except ValueError:
+        raise LoaderError(
+            f"invalid documents selection {value!r}, expected an index, "
+            "a range like 2:5, or key=value"
+        ) from None
+
+
+def _yaml_stream(source, path, encoding, no_cache):
+    import yaml
+
+    def build():
+        # Encodings with a byte order mark still qualify, as long as
+        # the markers look the same as in ASCII.
+        if not "---\n...%#".encode(encoding).endswith(b"---\n...%#"):
+            # The markers cannot be found by looking at the bytes, so
+            # parse everything up front.
+            def read(yaml_loader):
+                with open(path, "r", encoding=encoding) as f:
+                    return list(yaml.load_all(f, Loader=yaml_loader))
+
+            try:
+                documents = parse_with_backend("yaml", read, yaml.YAMLError)
+            except yaml.error.MarkedYAMLError as error:
+                raise _yaml_loader_error(error, source, path) from error
+            return _YAMLStream(source, path, encoding, documents=documents)
+        spans = cached_load(
+            "yaml-index",
+            path,
+            (),
+            functools.partial(_index_yaml_documents, path),
+            no_cache,
+        )
+        return _YAMLStream(source, path, encoding, spans=spans)
+
+    if no_cache:
+        return build()
+    path = os.path.abspath(path)
+    return data_cache.get_or_load(
+        ("yaml-stream", path, (encoding,)),
+        path,
+        build,
+        _size_factors["yaml-stream"],
+    )
+
 
 @file_extension_loader("yaml", [".yml", ".yaml"])
 @contextlib.contextmanager
@@ -140,38 +1264,468 @@ def load_yaml(
     absolute_resolved_path,
     encoding="utf-8-sig",
     multiple_documents=False,
+    documents=None,
+    no_cache=False,
     **options,
 ):
-    with open(absolute_resolved_path, "r", encoding=encoding) as f:
+    import yaml
+
+    if multiple_documents or documents is not None:
+        stream = _yaml_stream(source, absolute_resolved_path, encoding, no_cache)
+        all_documents = YAMLDocuments(stream, range(len(stream)))
+        if documents is None:
+            yield all_documents
+            return
+        selection = _parse_yaml_documents_option(documents)
+        if isinstance(selection, int):
+            try:
+                document = all_documents[selection]
+            except IndexError:
+                raise LoaderError(
+                    f"document {selection} requested, but there are only "
+                    f"{len(all_documents)}"
+                ) from None
+            yield document
+        elif isinstance(selection, slice):
+            yield all_documents[selection]
+        else:
+            key, expected = selection
+            yield YAMLDocuments(stream, _match_yaml_documents(stream, key, expected))
+        return
+
+    def read(yaml_loader):
+        with open(absolute_resolved_path, "r", encoding=encoding) as f:
+            return yaml.load(f, Loader=yaml_loader)
+
+    def parse():
         try:
-            if multiple_documents:
-                yield list(
-                    yaml.safe_load_all(f)
-                )  # force loading all documents now so the file can be closed
-            else:
-                yield yaml.safe_load(f)
+            return parse_with_backend("yaml", read, yaml.YAMLError)
         except yaml.error.MarkedYAMLError as error:
-            if error.context_mark.name == absolute_resolved_path:
-                error.context_mark.name = source
-            error.problem_mark.name = source
-            raise LoaderError(str(error)) from error
+            raise _yaml_loader_error(error, source, absolute_resolved_path) from error
+
+    yield cached_load("yaml", absolute_resolved_path, (encoding,), parse, no_cache)
+
+
+def _match_yaml_documents(stream, key, expected):
+    matches = []
+    for index in range(len(stream)):
+        # Skip parsing documents that cannot possibly match. The value
+        # may be written in many ways, like true or 0x10, so only the
+        # key is looked for, unless an escape sequence could spell it.
+        if stream.spans is not None:
+            text = stream.text(index)
+            if key not in text and "\\" not in text:
+                continue
+        document = stream.document(index)
+        if isinstance(document, dict) and str(document.get(key)) == expected:
+            matches.append(index)
+    return matches
+
+
+_XML_STEP = re.compile(
+    r"(?P<axis>//?)(?P<tag>(?:\{[^}]*\})?[^/\[]+)(?P<predicates>(?:\[[^\]]*\])*)"
+)
+_XML_PREDICATE = re.compile(
+    r"\[\s*@(?P<attr>[^=\]\s]+)\s*"
+    r"(?:=\s*(?P<quote>['\"])(?P<value>.*?)(?P=quote)\s*)?\]"
+)
+
+
+def _parse_xml_path(path):
+    """Parse the ``select`` option into a list of steps.
+
+    Each step is a ``(descendant, tag, predicates)`` tuple, where
+    ``descendant`` is set for steps that may skip levels (``//``),
+    ``tag`` may be ``*``, and ``predicates`` is a list of
+    ``(attribute, value)`` tuples with ``value`` set to ``None`` if the
+    attribute only has to be present.
+    """
+    path = path.strip()
+    if not path.startswith("/"):
+        # Relative to the root element, like Element.findall().
+        path = "/*/" + path
+    steps = []
+    pos = 0
+    while pos < len(path):
+        match = _XML_STEP.match(path, pos)
+        if not match:
+            raise LoaderError(f"invalid element path {path!r}")
+        predicates = []
+        for pred in re.finditer(r"\[[^\]]*\]", match["predicates"]):
+            pred_match = _XML_PREDICATE.fullmatch(pred.group())
+            if not pred_match:
+                raise LoaderError(
+                    f"invalid predicate {pred.group()!r} in element path, "
+                    "expected [@attr] or [@attr='value']"
+                )
+            predicates.append((pred_match["attr"], pred_match["value"]))
+        steps.append((match["axis"] == "//", match["tag"].strip(), predicates))
+        pos = match.end()
+    return steps
+
+
+def _xml_step_matches(step, elem):
+    _, tag, predicates = step
+    if tag != "*" and tag != elem.tag:
+        return False
+    for attr, value in predicates:
+        actual = elem.get(attr)
+        if actual is None or (value is not None and actual != value):
+            return False
+    return True
+
+
+def _xml_path_matches(steps, stack, si=0, ki=0):
+    # Match the whole stack of open elements against the steps.
+    if si == len(steps):
+        return ki == len(stack)
+    step = steps[si]
+    if step[0]:
+        return any(
+            _xml_step_matches(step, stack[k])
+            and _xml_path_matches(steps, stack, si + 1, k + 1)
+            for k in range(ki, len(stack))
+        )
+    return (
+        ki < len(stack)
+        and _xml_step_matches(step, stack[ki])
+        and _xml_path_matches(steps, stack, si + 1, ki + 1)
+    )
+
+
+def _xml_text(text):
+    if text is None or not text.strip():
+        return None
+    return text
+
+
+def xml_to_dict(elem):
+    """Convert an XML element to plain Python data.
+
+    The result is a :py:class:`dict` with the keys ``tag``,
+    ``attrib``, ``text``, ``tail``, and ``children``, mirroring the
+    :py:class:`xml.etree.ElementTree.Element` API. Text made up only
+    of whitespace is replaced with ``None``.
+
+    :param elem: The element to convert.
+    """
+    return {
+        "tag": elem.tag,
+        "attrib": dict(elem.attrib),
+        "text": _xml_text(elem.text),
+        "tail": _xml_text(elem.tail),
+        "children": [xml_to_dict(child) for child in elem],
+    }
+
+
+def _select_xml(path, select, as_dict):
+    """Return the elements matching the path, streaming the file.
+
+    Elements outside of the matches are discarded as soon as they are
+    complete, so memory use depends on the size of the matches rather
+    than the size of the document.
+    """
+    import defusedxml.ElementTree as ET
+
+    steps = _parse_xml_path(select)
+    stack = []
+    inside = []  # whether each open element is, or is inside, a match
+    results = []
+    positions = {}
+    for event, elem in ET.iterparse(path, events=("start", "end")):
+        if event == "start":
+            stack.append(elem)
+            is_match = _xml_path_matches(steps, stack)
+            if is_match:
+                if as_dict:
+                    positions[id(elem)] = len(results)
+                results.append(elem)
+            inside.append(is_match or bool(inside and inside[-1]))
+            continue
+        stack.pop()
+        kept = inside.pop()
+        if as_dict and id(elem) in positions:
+            results[positions.pop(id(elem))] = xml_to_dict(elem)
+        if inside and inside[-1]:
+            # Still needed by the enclosing match.
+            continue
+        if as_dict or not kept:
+            elem.clear()
+        if stack:
+            stack[-1].remove(elem)
+    return results
 
 
 @lenient_mimetype_loader("xml", "xml")
 @contextlib.contextmanager
-def load_xml(source, absolute_resolved_path, **options):
+def load_xml(
+    source,
+    absolute_resolved_path,
+    select=None,
+    as_dict=False,
+    no_cache=False,
+    **options,
+):
+    import defusedxml.ElementTree as ET
+
+    def parse():
+        try:
+            if select:
+                return _select_xml(absolute_resolved_path, select, as_dict)
+            root = ET.parse(absolute_resolved_path).getroot()
+        except ET.ParseError as error:
+            raise LoaderError(str(error)) from error
+        return xml_to_dict(root) if as_dict else root
+
+    yield cached_load(
+        "xml",
+        absolute_resolved_path,
+        (select or None, bool(as_dict)),
+        parse,
+        no_cache,
+    )
+
+
+def _dbm_key(key):
+    return key.encode("utf-8") if isinstance(key, str) else key
+
+
+class DBMHandle:
+    """Read-only view of a dbm database with bulk access helpers.
+
+    Supports the read methods of the objects returned by
+    :py:func:`dbm.open`. Values fetched with :py:meth:`prefetch` are
+    kept in memory, so later lookups of those keys do not go back to
+    the database.
+
+    :param db: The open database.
+    """
+
+    def __init__(self, db):
+        self._db = db
+        self._values = {}
+        self._sorted_keys = None
+        self._lock = threading.RLock()
+
+    def __getattr__(self, name):
+        return getattr(self._db, name)
+
+    def __getitem__(self, key):
+        key = _dbm_key(key)
+        try:
+            return self._values[key]
+        except KeyError:
+            pass
+        with self._lock:
+            return self._db[key]
+
+    def __contains__(self, key):
+        key = _dbm_key(key)
+        if key in self._values:
+            return True
+        with self._lock:
+            return key in self._db
+
+    def __len__(self):
+        with self._lock:
+            return len(self._db)
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __repr__(self):
+        return f"<{type(self).__name__} {self._db!r}>"
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def keys(self):
+        with self._lock:
+            return self._db.keys()
+
+    def items(self):
+        return [(key, self[key]) for key in self.keys()]
+
+    def prefetch(self, keys=None):
+        """Fetch the values of many keys at once.
+
+        Returns a :py:class:`dict` mapping each key found in the
+        database to its value. Keys that are missing are left out.
+
+        :param keys: The keys to fetch. Defaults to all keys.
+        """
+        with self._lock:
+            if keys is None:
+                keys = self._db.keys()
+            found = {}
+            for key in keys:
+                k = _dbm_key(key)
+                value = self._values.get(k)
+                if value is None:
+                    try:
+                        value = self._values[k] = self._db[k]
+                    except KeyError:
+                        continue
+                found[key] = value
+        return found
+
+    def sorted_keys(self):
+        "Return the keys in sorted order."
+        with self._lock:
+            if self._sorted_keys is None:
+                self._sorted_keys = sorted(self._db.keys())
+        return list(self._sorted_keys)
+
+    def close(self):
+        with self._lock:
+            self._values.clear()
+            self._db.close()
+
+
+def _open_dbm(path):
+    import dbm
+
     try:
-        yield ET.parse(absolute_resolved_path).getroot()
-    except ET.ParseError as error:
+        return DBMHandle(dbm.open(path, "r"))
+    except dbm.error[0] as error:
         raise LoaderError(str(error)) from error
 
 
+# Read-only dbm handles shared by all directives for the lifetime of a
+# build.
+dbm_handles = cache.HandlePool(_open_dbm)
+
+
 @file_extension_loader("dbm", [".dbm"])
-def load_dbm(source, absolute_resolved_path, **options):
+@contextlib.contextmanager
+def load_dbm(source, absolute_resolved_path, no_cache=False, **options):
+    if not no_cache:
+        yield dbm_handles.get(absolute_resolved_path)
+        return
+    with contextlib.closing(_open_dbm(absolute_resolved_path)) as handle:
+        yield handle
+
+
+def _open_sqlite(path):
+    import sqlite3
+
+    if not os.path.exists(path):
+        # Opening would fail with a less helpful message.
+        raise FileNotFoundError(path)
     try:
-        return dbm.open(absolute_resolved_path, "r")
-    except dbm.error[0] as error:
+        connection = sqlite3.connect(
+            pathlib.Path(path).as_uri() + "?mode=ro",
+            uri=True,
+            check_same_thread=False,
+        )
+        connection.execute("PRAGMA query_only = ON")
+    except sqlite3.Error as error:
         raise LoaderError(str(error)) from error
+    connection.row_factory = sqlite3.Row
+    return connection
+
+
+# Read-only SQLite connections shared by all directives for the
+# lifetime of a build.
+sqlite_connections = cache.HandlePool(_open_sqlite)
+
+
+def _parse_sqlite_params(value):
+    if not value or value is True:
+        return {}
+    if isinstance(value, collections.abc.Mapping):
+        return dict(value)
+    params = {}
+    for part in _split_option(value):
+        name, sep, param = part.partition("=")
+        if not sep or not name.strip():
+            raise LoaderError(f"invalid parameter {part!r}, expected name=value")
+        params[name.strip()] = param.strip()
+    return params
+
+
+class SQLiteRows:
+    """Rows returned by a query, fetched while iterating.
+
+    Each iteration runs the query again, so the rows can be looped
+    over more than once without keeping them all in memory. The rows
+    are :py:class:`sqlite3.Row` objects, which support access by
+    index and by column name.
+
+    :param connection: The connection to query.
+    :param query: The SQL query.
+    :param params: :py:class:`dict` of values for the named parameters
+        in the query.
+    """
+
+    def __init__(self, connection, query, params):
+        self._connection = connection
+        self.query = query
+        self.params = params
+
+    def __iter__(self):
+        import sqlite3
+
+        try:
+            cursor = self._connection.execute(self.query, self.params)
+            try:
+                yield from cursor
+            finally:
+                cursor.close()
+        except sqlite3.Error as error:
+            raise LoaderError(f"{error} in query {self.query!r}") from error
+
+    def __repr__(self):
+        return f"<{type(self).__name__} {self.query!r}>"
+
+
+class SQLiteDatabase:
+    """A read-only SQLite database.
+
+    :param connection: The open connection.
+    """
+
+    def __init__(self, connection):
+        self._connection = connection
+
+    def __repr__(self):
+        return f"<{type(self).__name__} {self._connection!r}>"
+
+    def query(self, query, **params):
+        """Return the rows selected by ``query``.
+
+        :param query: The SQL query.
+        :param params: Values for the named parameters in the query.
+        """
+        return SQLiteRows(self._connection, query, params)
+
+
+@file_extension_loader("sqlite", [".db", ".sqlite", ".sqlite3"])
+@contextlib.contextmanager
+def load_sqlite(
+    source,
+    absolute_resolved_path,
+    query=None,
+    params=None,
+    no_cache=False,
+    **options,
+):
+    params = _parse_sqlite_params(params)
+    if no_cache:
+        connection = _open_sqlite(absolute_resolved_path)
+    else:
+        connection = sqlite_connections.get(absolute_resolved_path)
+    try:
+        if query:
+            yield SQLiteRows(connection, query, params)
+        else:
+            yield SQLiteDatabase(connection)
+    finally:
+        if no_cache:
+            connection.close()
 
 
 @data_source_loader("import-module")
@@ -0,0 +1,170 @@
+"""Parse the data sources used by outdated documents before reading them.
+
+When Sphinx reads documents in parallel, each worker process starts
+with a copy of the main process, so data parsed here is shared with
+all of them instead of being parsed again by each worker.
+"""
+
+import concurrent.futures
+import os
+import re
+import time
+
+from sphinx.util import logging
+
+from . import domain, loaders
+
+LOG = logging.getLogger(__name__)
+
+# Default limits for the sources parsed up front.
+DEFAULT_MAX_SOURCES = 100
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+# The directives whose loaders keep the parsed data in the cache.
+# The others open their source on demand, so there is nothing to
+# parse ahead of time.
+PREFETCHABLE = {"json", "yaml", "csv", "xml", "jsonl"}
+
+# The start of a directive in reStructuredText or MyST markdown.
+_DIRECTIVE = re.compile(
+    r"^(?P<indent>\s*)(?:\.\.\s+|`{3,}\{)datatemplate:(?P<name>[\w-]+)"
+    r"(?:::|\})[ \t]*(?P<argument>.*?)\s*$"
+)
+_OPTION = re.compile(r"^(?P<indent>\s*):(?P<name>[\w-]+):(?:\s+(?P<value>.*?))?\s*$")
+
+
+def scan(text):
+    """Yield the directives found in a document.
+
+    Each directive is a ``(name, argument, options)`` tuple, where
+    ``options`` maps the option names to their unconverted values.
+
+    :param text: The source of the document.
+    """
+    lines = text.splitlines()
+    for i, line in enumerate(lines):
+        match = _DIRECTIVE.match(line)
+        if not match:
+            continue
+        options = {}
+        option_indent = None
+        last = None
+        for line in lines[i + 1 :]:
+            option = _OPTION.match(line)
+            if option:
+                options[option["name"]] = option["value"] or ""
+                option_indent = len(option["indent"])
+                last = option["name"]
+            elif (
+                last is not None
+                and line.strip()
+                and len(line) - len(line.lstrip()) > option_indent
+            ):
+                # A value continued on the next line.
+                options[last] += " " + line.strip()
+            else:
+                break
+        yield match["name"], match["argument"], options
+
+
+def _requests(env, docnames, max_sources, max_bytes):
+    # Return the loader calls for the directives in the documents,
+    # without duplicates, and the number of sources left out.
+    directives = domain.DataTemplateDomain.directives
+    requests = {}
+    skipped = 0
+    for docname in docnames:
+        try:
+            with open(env.doc2path(docname), encoding="utf-8-sig") as f:
+                text = f.read()
+        except (OSError, UnicodeError):
+            continue
+        for name, argument, raw_options in scan(text):
+            if name not in PREFETCHABLE:
+                continue
+            cls = directives[name]
+            try:
+                options = {
+                    k: cls.option_spec[k](v or None) for k, v in raw_options.items()
+                }
+            except (ValueError, TypeError):
+                continue
+            source = options.get("source") or argument
+            if not source or options.get("no-cache") or options.get("stream"):
+                continue
+            if name == "jsonl" and not options.get("index-key"):
+                continue
+            relative_resolved_path, absolute_resolved_path = env.relfn2path(
+                source, docname
+            )
+            try:
+                size = os.path.getsize(absolute_resolved_path)
+            except OSError:
+                continue
+            loader_options = {
+                "source": source,
+                "relative_resolved_path": relative_resolved_path,
+                "absolute_resolved_path": absolute_resolved_path,
+            }
+            parse_options = {}
+            for k, v in options.items():
+                if k not in ("source", "template"):
+                    parse_options[k.lower().replace("-", "_")] = v
+            loader_options.update(parse_options)
+            key = (
+                cls.loader,
+                absolute_resolved_path,
+                repr(sorted(parse_options.items())),
+            )
+            if key in requests:
+                continue
+            if size > max_bytes or len(requests) >= max_sources:
+                skipped += 1
+                continue
+            requests[key] = (cls.loader, loader_options)
+    return list(requests.values()), skipped
+
+
+def _load(loader, loader_options):
+    try:
+        with loader(**loader_options):
+            pass
+    except (OSError, loaders.LoaderError, ValueError) as err:
+        # The directive reports the problem when it is read.
+        LOG.verbose(
+            "datatemplates: could not prefetch %s: %s",
+            loader_options["relative_resolved_path"],
+            err,
+        )
+        return False
+    return True
+
+
+def prefetch_sources(app, env, docnames):
+    """Parse the sources of the directives in ``docnames``.
+
+    Connected to the ``env-before-read-docs`` event.
+    """
+    config = app.config
+    if not config.datatemplates_prefetch or not docnames:
+        return
+    start = time.perf_counter()
+    requests, skipped = _requests(
+        env,
+        docnames,
+        config.datatemplates_prefetch_max_sources,
+        config.datatemplates_prefetch_max_bytes,
+    )
+    if not requests:
+        return
+    with concurrent.futures.ThreadPoolExecutor(
+        config.datatemplates_prefetch_workers
+    ) as pool:
+        loaded = sum(pool.map(lambda request: _load(*request), requests))
+    LOG.info(
+        "datatemplates: prefetched %d of %d sources in %.2fs (%d over the limits)",
+        loaded,
+        len(requests),
+        time.perf_counter() - start,
+        skipped,
+    )
@@ -0,0 +1,165 @@
+"""Profile the loading and rendering of individual directives.
+
+The directives are run under :py:mod:`cProfile`, and the functions
+Jinja compiles templates into are relabelled with the name of the
+template and the template line they start on. The time spent on each
+template line is traced as well, and added to the profile as an entry
+per line, so the hot lines of a template sort next to the functions
+they call.
+"""
+
+import cProfile
+import fnmatch
+import os
+import pstats
+import sys
+import time
+
+from sphinx.util import logging
+
+LOG = logging.getLogger(__name__)
+
+# Directory holding the profiles, in the output directory.
+PROFILE_DIRECTORY = "datatemplates-profiles"
+
+# Number of template lines listed in the build output.
+TOP_LINES = 5
+
+
+def matches(patterns, docname, source):
+    """Return whether a directive should be profiled.
+
+    :param patterns: Shell-style patterns, see :py:mod:`fnmatch`.
+    :param docname: The document the directive is in.
+    :param source: The data source of the directive.
+    """
+    return any(
+        fnmatch.fnmatchcase(docname, pattern)
+        or (source and fnmatch.fnmatchcase(source, pattern))
+        for pattern in patterns
+    )
+
+
+def _template_label(template):
+    return template.name or "<inline>"
+
+
+class DirectiveProfiler:
+    """Profile the code run in the ``with`` block.
+
+    Besides the functions, the time spent on each line of the Jinja
+    templates is recorded. The time of a line includes the calls made
+    from it.
+    """
+
+    def __init__(self):
+        self.profile = cProfile.Profile()
+        # (template label, template line) -> [hits, seconds]
+        self.lines = {}
+        # cProfile function keys -> relabelled keys
+        self.functions = {}
+        self._line_numbers = {}
+        self._previous_trace = None
+
+    def __enter__(self):
+        self._previous_trace = sys.gettrace()
+        sys.settrace(self._trace)
+        self.profile.enable()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.profile.disable()
+        sys.settrace(self._previous_trace)
+        return False
+
+    def _template_line(self, template, lineno):
+        key = (template, lineno)
+        line = self._line_numbers.get(key)
+        if line is None:
+            line = self._line_numbers[key] = template.get_corresponding_lineno(lineno)
+        return line
+
+    def _trace(self, frame, event, arg):
+        if event != "call":
+            return None
+        template = frame.f_globals.get("__jinja_template__")
+        if template is None:
+            return None
+        code = frame.f_code
+        label = _template_label(template)
+        function = (code.co_filename, code.co_firstlineno, code.co_name)
+        if function not in self.functions:
+            self.functions[function] = (
+                label,
+                self._template_line(template, code.co_firstlineno),
+                f"{code.co_name} (template)",
+            )
+        # Generators, such as the root of a template, are traced
+        # again each time they resume.
+        current = [frame.f_lineno, time.perf_counter()]
+
+        def trace_lines(frame, event, arg):
+            if event in ("line", "return"):
+                now = time.perf_counter()
+                key = (label, self._template_line(template, current[0]))
+                entry = self.lines.setdefault(key, [0, 0.0])
+                entry[0] += 1
+                entry[1] += now - current[1]
+                current[0] = frame.f_lineno
+                current[1] = now
+            return trace_lines
+
+        return trace_lines
+
+    def stats(self):
+        """Return the profile as :py:class:`pstats.Stats`.
+
+        Template functions are relabelled, and each template line is
+        added as a function named ``line`` whose cumulative time is
+        the time spent on the line.
+        """
+        stats = pstats.Stats(self.profile)
+
+        def relabel(key):
+            return self.functions.get(key, key)
+
+        relabelled = {}
+        for key, (cc, nc, tt, ct, callers) in stats.stats.items():
+            relabelled[relabel(key)] = (
+                cc,
+                nc,
+                tt,
+                ct,
+                {relabel(caller): value for caller, value in callers.items()},
+            )
+        for (label, line), (hits, seconds) in self.lines.items():
+            # No own time, so the totals are not counted twice.
+            relabelled[(label, line, "line")] = (hits, hits, 0.0, seconds, {})
+        stats.stats = relabelled
+        return stats
+
+    def hot_lines(self, count=TOP_LINES):
+        "Return the template lines that took the longest."
+        ranked = sorted(self.lines.items(), key=lambda item: item[1][1], reverse=True)
+        return [
+            (label, line, hits, seconds)
+            for (label, line), (hits, seconds) in ranked[:count]
+        ]
+
+    def save(self, outdir, docname, lineno):
+        """Write the profile of the directive and log the hot lines.
+
+        :param outdir: The output directory of the builder.
+        :param docname: The document the directive is in.
+        :param lineno: The line of the directive.
+        """
+        directory = os.path.join(outdir, PROFILE_DIRECTORY)
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(
+            directory, "{}-{}.pstats".format(docname.replace("/", "-"), lineno)
+        )
+        self.stats().dump_stats(path)
+        LOG.info("datatemplates: profile of %s:%d written to %s", docname, lineno, path)
+        for label, line, hits, seconds in self.hot_lines():
+            LOG.info("  %.3fs %s:%d (%d times)", seconds, label, line, hits)
+        return path
@@ -0,0 +1,143 @@
+"""Measure the directives and report the slowest ones.
+
+Each directive records how long it spent loading its data, rendering
+its template, and parsing the output, along with the size of the data,
+the number of files parsed, and the size of the output. The records
+are kept in the domain data, so the ones made by parallel readers are
+merged into the main process, and written to a JSON report when the
+build finishes.
+"""
+
+import contextlib
+import json
+import os
+import time
+import tracemalloc
+
+from sphinx.util import logging
+
+LOG = logging.getLogger(__name__)
+
+# Name of the report, in the output directory.
+REPORT_NAME = "datatemplates-stats.json"
+
+# Default number of directives listed in the build output.
+DEFAULT_TOP = 10
+
+PHASES = ("load", "render", "parse")
+
+
+class Measurement:
+    """Measure the phases of a directive.
+
+    :param enabled: Set to measure. Otherwise the phases are only run.
+    :param memory: Set to also record the peak memory allocated, when
+        :py:mod:`tracemalloc` is tracing.
+    """
+
+    def __init__(self, enabled=True, memory=False):
+        self.enabled = enabled
+        self.memory = enabled and memory and tracemalloc.is_tracing()
+        self.seconds = dict.fromkeys(PHASES, 0.0)
+        if self.memory:
+            # The peak is only reset to what is traced now, so that is
+            # taken off to leave what the directive allocated.
+            tracemalloc.reset_peak()
+            self._start_bytes = tracemalloc.get_traced_memory()[0]
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        "Add the time spent in the ``with`` block to the phase ``name``."
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.seconds[name] += time.perf_counter() - start
+
+    def record(self, **values):
+        """Return the measurements, along with ``values``.
+
+        :param values: Other values describing the directive.
+        """
+        record = dict(values)
+        for name, seconds in self.seconds.items():
+            record[f"{name}_seconds"] = seconds
+        if self.memory:
+            peak = tracemalloc.get_traced_memory()[1]
+            record["peak_bytes"] = peak - self._start_bytes
+        return record
+
+
+def total_seconds(record):
+    "Return the time spent by the directive of ``record``."
+    return sum(record[f"{name}_seconds"] for name in PHASES)
+
+
+def build_report(records):
+    """Return the report for the directives measured.
+
+    The directives are sorted from the slowest to the fastest.
+
+    :param records: The records made by :py:meth:`Measurement.record`.
+    """
+    records = sorted(records, key=total_seconds, reverse=True)
+    totals = {"directives": len(records)}
+    for name in PHASES:
+        totals[f"{name}_seconds"] = sum(r[f"{name}_seconds"] for r in records)
+    totals["lines"] = sum(r["lines"] for r in records)
+    totals["parsed"] = sum(r.get("parsed", 0) for r in records)
+    return {"totals": totals, "directives": records}
+
+
+def start_memory_tracing(app):
+    """Start :py:mod:`tracemalloc` if peak memory use is measured.
+
+    Connected to the ``builder-inited`` event.
+    """
+    config = app.config
+    if (
+        config.datatemplates_stats
+        and config.datatemplates_stats_memory
+        and not tracemalloc.is_tracing()
+    ):
+        tracemalloc.start()
+
+
+def write_report(app, exception):
+    """Write the report of the directives read by the build.
+
+    Connected to the ``build-finished`` event.
+    """
+    config = app.config
+    if not config.datatemplates_stats:
+        return
+    if config.datatemplates_stats_memory and tracemalloc.is_tracing():
+        tracemalloc.stop()
+    if exception is not None:
+        return
+    domain = app.env.get_domain("datatemplate")
+    records = [record for records in domain.stats.values() for record in records]
+    report = build_report(records)
+    path = os.path.join(app.outdir, REPORT_NAME)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    LOG.info(
+        "datatemplates: measured %d directives, report written to %s",
+        len(records),
+        path,
+    )
+    for record in report["directives"][: config.datatemplates_stats_top]:
+        LOG.info(
+            "  %.3fs %s:%s %s (load %.3fs, render %.3fs, parse %.3fs, %d lines)",
+            total_seconds(record),
+            record["docname"],
+            record["lineno"],
+            record["directive"],
+            record["load_seconds"],
+            record["render_seconds"],
+            record["parse_seconds"],
+            record["lines"],
+        )
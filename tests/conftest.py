@@ -1,3 +1,4 @@
+import jinja2
 import pytest
 
 from pathlib import Path
@@ -21,3 +22,34 @@ def rootdir():
         abs_path = path(__file__).parent.abspath()
 
     return abs_path / "testdata"
+
+
+@pytest.fixture
+def build(make_app, app_params):
+    """
+    Fixture building the test project of 'pytest.mark.sphinx'.
+
+    Each call builds it again in a new application and returns it.
+    """
+
+    def build():
+        args, kwargs = app_params
+        app = make_app(*args, **kwargs)
+        app.build()
+        return app
+
+    return build
+
+
+class _Templates:
+    # Stands in for the template bridge of a builder.
+    def __init__(self, loader):
+        self.environment = jinja2.Environment(loader=loader)
+
+
+@pytest.fixture
+def make_templates():
+    """
+    Fixture making template bridges for the given Jinja loader.
+    """
+    return _Templates
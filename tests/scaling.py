@@ -0,0 +1,251 @@
+"""Measure how a full build scales with the size of the project.
+
+Generates synthetic Sphinx projects with a number of pages, each with
+a number of ``datatemplate:csv`` directives reading CSV files of a
+number of rows, builds them with ``sphinx-build`` in a separate
+process, and records the wall time and peak memory of each build,
+along with the time spent in the directives and the number of data
+sources parsed, taken from the ``datatemplates_stats`` report.
+
+Run it directly to choose the sizes, for example::
+
+    python tests/scaling.py --pages 10 20 40 --jobs 1 4 --output out.json
+
+Costs growing faster than the project are reported, and so are data
+sources parsed more often with more parallel workers, which means the
+workers parse the same sources again instead of sharing them.
+"""
+
+import argparse
+import itertools
+import json
+import math
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import synthetic
+
+# Number of data sources shared by the directives of a project.
+SOURCES = 10
+
+# Growth exponent above which a cost is considered super-linear.
+EXPONENT_TOLERANCE = 1.3
+
+# Measurements checked for super-linear growth.
+MEASURES = ('seconds', 'directive_seconds', 'max_rss_kb')
+
+DIMENSIONS = ('pages', 'directives', 'rows', 'jobs')
+
+# Builds the project and reports the peak memory of the process and
+# of the parallel workers it waited for.
+_BUILD = '''
+import json, resource, sys
+from sphinx.cmd.build import main
+status = main(sys.argv[1:])
+usage = [resource.getrusage(who).ru_maxrss
+         for who in (resource.RUSAGE_SELF, resource.RUSAGE_CHILDREN)]
+print(json.dumps({'status': status, 'max_rss_kb': max(usage)}))
+'''
+
+_TEMPLATE = (
+    '{{ make_list_table_from_mappings('
+    "[('A', 'col0'), ('B', 'col1'), ('C', 'col2')], data, 'Values') }}"
+)
+
+
+def make_project(root, pages, directives, rows, sources=SOURCES, **conf):
+    """Write a project to ``root`` and return its source directory.
+
+    :param pages: Number of pages.
+    :param directives: Number of directives on each page.
+    :param rows: Number of rows of each data source.
+    :param sources: Number of data sources shared by the directives.
+    :param conf: Other settings for ``conf.py``.
+    """
+    srcdir = os.path.join(root, 'source')
+    os.makedirs(os.path.join(srcdir, 'data'), exist_ok=True)
+    settings = {
+        'extensions': ['sphinxcontrib.datatemplates'],
+        'datatemplates_stats': True,
+        'datatemplates_stats_top': 0,
+    }
+    settings.update(conf)
+    with open(os.path.join(srcdir, 'conf.py'), 'w') as f:
+        for name, value in settings.items():
+            f.write(f'{name} = {value!r}\n')
+    for k in range(sources):
+        path = os.path.join(srcdir, 'data', f'source{k}.csv')
+        synthetic.write_csv(path, rows, 3, seed=k)
+    with open(os.path.join(srcdir, 'index.rst'), 'w') as f:
+        f.write('Scaling\n=======\n\n.. toctree::\n   :glob:\n\n   page*\n')
+    for i in range(pages):
+        with open(os.path.join(srcdir, f'page{i}.rst'), 'w') as f:
+            f.write(f'Page {i}\n=========\n')
+            for j in range(directives):
+                source = f'data/source{(i * directives + j) % sources}.csv'
+                f.write(
+                    f'\n.. datatemplate:csv:: {source}\n'
+                    '   :headers:\n\n'
+                    f'   {_TEMPLATE}\n'
+                )
+    return srcdir
+
+
+def build(srcdir, outdir, jobs=1):
+    """Build the project in a new process and return the measurements.
+
+    :param jobs: Number of parallel processes, passed to ``-j``.
+    """
+    command = [sys.executable, '-c', _BUILD, '-E', '-q', '-j', str(jobs)]
+    start = time.perf_counter()
+    result = subprocess.run(
+        command + [srcdir, outdir], capture_output=True, text=True
+    )
+    seconds = time.perf_counter() - start
+    if result.returncode or not result.stdout.strip():
+        raise RuntimeError(f'build of {srcdir} failed:\n{result.stderr}')
+    measured = json.loads(result.stdout.strip().splitlines()[-1])
+    if measured['status']:
+        raise RuntimeError(f'build of {srcdir} failed:\n{result.stderr}')
+    with open(os.path.join(outdir, 'datatemplates-stats.json')) as f:
+        totals = json.load(f)['totals']
+    return {
+        'seconds': seconds,
+        'max_rss_kb': measured['max_rss_kb'],
+        'directive_seconds': sum(
+            totals[f'{name}_seconds'] for name in ('load', 'render', 'parse')
+        ),
+        'parsed': totals['parsed'],
+    }
+
+
+def run_grid(root, pages, directives, rows, jobs, **conf):
+    """Build a project for each combination of the sizes given.
+
+    Returns a list of measurements, each with the sizes it was made
+    with.
+    """
+    results = []
+    for p, d, r in itertools.product(pages, directives, rows):
+        project = os.path.join(root, f'p{p}-d{d}-r{r}')
+        srcdir = make_project(project, p, d, r, **conf)
+        for j in jobs:
+            outdir = os.path.join(project, f'build-j{j}')
+            measured = build(srcdir, outdir, j)
+            measured.update(pages=p, directives=d, rows=r, jobs=j)
+            results.append(measured)
+    return results
+
+
+def _size(result, dimension):
+    size = result['pages'] * result['directives']
+    if dimension == 'rows':
+        size *= result['rows']
+    return size
+
+
+def curves(results):
+    """Group the measurements into curves along each dimension.
+
+    Returns a mapping of ``(dimension, fixed sizes)`` to the results
+    where only ``dimension`` changes, ordered by its size.
+    """
+    grouped = {}
+    for dimension in DIMENSIONS:
+        for result in results:
+            fixed = tuple(
+                (name, result[name]) for name in DIMENSIONS if name != dimension
+            )
+            grouped.setdefault((dimension, fixed), []).append(result)
+    return {
+        key: sorted(points, key=lambda r: r[key[0]])
+        for key, points in grouped.items()
+        if len(points) > 1
+    }
+
+
+def analyze(results):
+    "Return descriptions of the suspicious changes in ``results``."
+    problems = []
+    for (dimension, fixed), points in curves(results).items():
+        where = ', '.join(f'{name}={value}' for name, value in fixed)
+        for before, after in zip(points, points[1:]):
+            if dimension == 'jobs':
+                if after['parsed'] > before['parsed']:
+                    problems.append(
+                        f'{after["parsed"]} sources parsed with '
+                        f'-j {after["jobs"]} and {before["parsed"]} with '
+                        f'-j {before["jobs"]} ({where}): workers parse the '
+                        'same sources again'
+                    )
+                continue
+            growth = _size(after, dimension) / _size(before, dimension)
+            for measure in MEASURES:
+                ratio = after[measure] / before[measure]
+                exponent = math.log(ratio) / math.log(growth)
+                if exponent > EXPONENT_TOLERANCE:
+                    problems.append(
+                        f'{measure} grows as {dimension}^{exponent:.2f} '
+                        f'from {before[dimension]} to {after[dimension]} '
+                        f'({where})'
+                    )
+    return problems
+
+
+def format_table(results):
+    "Return the measurements as a text table."
+    lines = ['pages  dirs   rows jobs  seconds directives  parsed  rss MB']
+    for r in results:
+        lines.append(
+            f'{r["pages"]:>5} {r["directives"]:>5} {r["rows"]:>6} '
+            f'{r["jobs"]:>4} {r["seconds"]:>8.2f} '
+            f'{r["directive_seconds"]:>10.2f} {r["parsed"]:>7} '
+            f'{r["max_rss_kb"] / 1024:>7.1f}'
+        )
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description=__doc__.partition('\n\n')[0]
+    )
+    parser.add_argument('--pages', type=int, nargs='+', default=[10, 20, 40])
+    parser.add_argument('--directives', type=int, nargs='+', default=[5])
+    parser.add_argument('--rows', type=int, nargs='+', default=[100])
+    parser.add_argument('--jobs', type=int, nargs='+', default=[1])
+    parser.add_argument(
+        '--no-disk-cache',
+        action='store_true',
+        help='disable datatemplates_disk_cache in the projects',
+    )
+    parser.add_argument('--output', help='file to write the results to')
+    parser.add_argument('--keep', help='directory to keep the projects in')
+    args = parser.parse_args(argv)
+
+    conf = {}
+    if args.no_disk_cache:
+        conf['datatemplates_disk_cache'] = False
+    with tempfile.TemporaryDirectory() as tmp:
+        results = run_grid(
+            args.keep or tmp,
+            args.pages,
+            args.directives,
+            args.rows,
+            args.jobs,
+            **conf,
+        )
+    print(format_table(results))
+    problems = analyze(results)
+    for problem in problems:
+        print('warning:', problem)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'results': results, 'problems': problems}, f, indent=2)
+    return 1 if problems else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
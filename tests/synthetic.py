@@ -0,0 +1,118 @@
+"""Deterministic generators of synthetic data sources.
+
+The same arguments always produce the same data, so measurements
+made with it can be compared between runs.
+"""
+
+import csv
+import json
+import random
+from xml.sax.saxutils import escape, quoteattr
+
+WORDS = [
+    'alpha',
+    'beta',
+    'gamma',
+    'delta',
+    'part*',
+    'under_score',
+    '`quoted`',
+    'back\\slash',
+    'wide value with spaces',
+    'ünïcödé',
+]
+
+
+def value(rng):
+    "Return a random cell value."
+    kind = rng.randrange(3)
+    if kind == 0:
+        return rng.randrange(1_000_000)
+    if kind == 1:
+        return round(rng.uniform(-1000, 1000), 3)
+    return rng.choice(WORDS)
+
+
+def strings(count, seed=0):
+    "Return ``count`` strings, some with characters RST escapes."
+    rng = random.Random(seed)
+    return [
+        ' '.join(rng.choice(WORDS) for _ in range(rng.randint(1, 5)))
+        for _ in range(count)
+    ]
+
+
+def column_names(columns):
+    return [f'col{i}' for i in range(columns)]
+
+
+def rows(count, columns, seed=0):
+    "Return ``count`` lists of ``columns`` values."
+    rng = random.Random(seed)
+    return [[value(rng) for _ in range(columns)] for _ in range(count)]
+
+
+def records(count, columns, seed=0):
+    "Return ``count`` mappings of ``columns`` names to values."
+    names = column_names(columns)
+    return [dict(zip(names, row)) for row in rows(count, columns, seed)]
+
+
+def nested(depth, breadth, seed=0):
+    """Return mappings nested ``depth`` levels deep.
+
+    Every mapping has ``breadth`` keys, so there are ``breadth **
+    depth`` leaves.
+    """
+    rng = random.Random(seed)
+
+    def build(level):
+        if level == depth:
+            return value(rng)
+        return {f'key{i}': build(level + 1) for i in range(breadth)}
+
+    return build(0)
+
+
+def broad(count, seed=0):
+    "Return a mapping with ``count`` keys of records."
+    rng = random.Random(seed)
+    return {
+        f'item{i}': {'name': rng.choice(WORDS), 'value': value(rng)}
+        for i in range(count)
+    }
+
+
+def write_csv(path, count, columns, seed=0):
+    "Write a CSV file with a header row and ``count`` rows."
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(column_names(columns))
+        writer.writerows(rows(count, columns, seed))
+
+
+def write_json(path, data):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+
+
+def write_yaml(path, data):
+    import yaml
+
+    with open(path, 'w', encoding='utf-8') as f:
+        yaml.safe_dump(data, f)
+
+
+def write_xml(path, count, seed=0):
+    "Write an XML file with ``count`` ``item`` elements."
+    rng = random.Random(seed)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('<items>\n')
+        for i in range(count):
+            f.write(
+                f'<item id="{i}" kind={quoteattr(rng.choice(WORDS))}>'
+                f'<name>{escape(rng.choice(WORDS))}</name>'
+                f'<value>{value(rng)}</value>'
+                '</item>\n'
+            )
+        f.write('</items>\n')
@@ -0,0 +1,224 @@
+"""Measure the loaders and helpers as the data grows.
+
+The benchmarks are skipped unless ``DATATEMPLATES_BENCHMARK`` is set:
+
+``DATATEMPLATES_BENCHMARK=1``
+    Run the benchmarks and compare them with the stored baseline.
+``DATATEMPLATES_BENCHMARK=update``
+    Run the benchmarks and store the results as the new baseline.
+
+Set ``DATATEMPLATES_BENCHMARK_OUTPUT`` to a file name to also save the
+results of a run. Times are compared with
+``DATATEMPLATES_BENCHMARK_TOLERANCE`` (default 2.0) times the baseline,
+to allow for slower machines. Peak memory does not depend on the
+machine, so it is compared more strictly. Each benchmark also runs
+with a quarter of the data, to catch costs growing faster than the
+data.
+"""
+
+import json
+import os
+import pathlib
+import time
+import tracemalloc
+
+import pytest
+
+import synthetic
+from sphinxcontrib.datatemplates import helpers, loaders
+
+BENCHMARK = os.environ.get('DATATEMPLATES_BENCHMARK')
+OUTPUT = os.environ.get('DATATEMPLATES_BENCHMARK_OUTPUT')
+BASELINE = pathlib.Path(__file__).parent / 'benchmark-baseline.json'
+
+TIME_TOLERANCE = float(
+    os.environ.get('DATATEMPLATES_BENCHMARK_TOLERANCE', 2.0)
+)
+MEMORY_TOLERANCE = 1.25
+# Allowed growth of the time per item from a quarter of the data to
+# all of it.
+SCALING_TOLERANCE = 2.0
+REPEAT = 3
+
+pytestmark = pytest.mark.skipif(
+    not BENCHMARK, reason='set DATATEMPLATES_BENCHMARK to run the benchmarks'
+)
+
+
+def _load(loader, path, **options):
+    def run():
+        with loader(path.name, str(path), no_cache=True, **options) as data:
+            return data
+
+    return run
+
+
+def csv_tall(tmp_path, size):
+    path = tmp_path / 'tall.csv'
+    synthetic.write_csv(path, size, 5)
+    return _load(loaders.load_csv, path, headers=True)
+
+
+def csv_wide(tmp_path, size):
+    path = tmp_path / 'wide.csv'
+    synthetic.write_csv(path, 100, size)
+    return _load(loaders.load_csv, path, headers=True)
+
+
+def _branches(size):
+    # Branches of 1024 leaves, six levels deep.
+    return {
+        f'branch{i}': synthetic.nested(5, 4, i) for i in range(size // 1024)
+    }
+
+
+def json_deep(tmp_path, size):
+    path = tmp_path / 'deep.json'
+    synthetic.write_json(path, _branches(size))
+    return _load(loaders.load_json, path)
+
+
+def json_broad(tmp_path, size):
+    path = tmp_path / 'broad.json'
+    synthetic.write_json(path, synthetic.broad(size))
+    return _load(loaders.load_json, path)
+
+
+def yaml_deep(tmp_path, size):
+    path = tmp_path / 'deep.yaml'
+    synthetic.write_yaml(path, _branches(size))
+    return _load(loaders.load_yaml, path)
+
+
+def yaml_broad(tmp_path, size):
+    path = tmp_path / 'broad.yaml'
+    synthetic.write_yaml(path, synthetic.broad(size))
+    return _load(loaders.load_yaml, path)
+
+
+def xml_large(tmp_path, size):
+    path = tmp_path / 'large.xml'
+    synthetic.write_xml(path, size)
+    return _load(loaders.load_xml, path)
+
+
+def xml_select(tmp_path, size):
+    path = tmp_path / 'large.xml'
+    synthetic.write_xml(path, size)
+    return _load(loaders.load_xml, path, select='item[@kind="alpha"]')
+
+
+def list_table(tmp_path, size):
+    rows = synthetic.rows(size, 5)
+    headers = synthetic.column_names(5)
+    return lambda: helpers.make_list_table(headers, rows, 'Table')
+
+
+def list_table_from_mappings(tmp_path, size):
+    records = synthetic.records(size, 5)
+    headers = [(name.upper(), name) for name in synthetic.column_names(5)]
+    return lambda: helpers.make_list_table_from_mappings(
+        headers, records, 'Table'
+    )
+
+
+def table(tmp_path, size):
+    rows = synthetic.rows(size, 5)
+    headers = synthetic.column_names(5)
+    return lambda: helpers.make_table(headers, rows, 'Table')
+
+
+def table_from_mappings(tmp_path, size):
+    records = synthetic.records(size, 5)
+    headers = [(name.upper(), name) for name in synthetic.column_names(5)]
+    return lambda: helpers.make_table_from_mappings(headers, records, 'Table')
+
+
+def escape_rst(tmp_path, size):
+    strings = synthetic.strings(size)
+    return lambda: [helpers.escape_rst(s) for s in strings]
+
+
+# name -> (setup, number of items)
+BENCHMARKS = {
+    'csv-tall': (csv_tall, 20_000),
+    'csv-wide': (csv_wide, 2_000),
+    'json-deep': (json_deep, 65_536),
+    'json-broad': (json_broad, 50_000),
+    'yaml-deep': (yaml_deep, 8_192),
+    'yaml-broad': (yaml_broad, 4_000),
+    'xml-large': (xml_large, 20_000),
+    'xml-select': (xml_select, 20_000),
+    'make-list-table': (list_table, 10_000),
+    'make-list-table-from-mappings': (list_table_from_mappings, 10_000),
+    'make-table': (table, 10_000),
+    'make-table-from-mappings': (table_from_mappings, 10_000),
+    'escape-rst': (escape_rst, 100_000),
+}
+
+
+def measure(run, items):
+    "Return the best time of ``run`` and the peak memory it allocates."
+    seconds = float('inf')
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        run()
+        seconds = min(seconds, time.perf_counter() - start)
+    tracemalloc.start()
+    try:
+        run()
+        peak_bytes = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {
+        'items': items,
+        'seconds': seconds,
+        'items_per_second': items / seconds,
+        'peak_bytes': peak_bytes,
+    }
+
+
+@pytest.fixture(scope='module')
+def results():
+    results = {}
+    yield results
+    if BENCHMARK == 'update':
+        BASELINE.write_text(
+            json.dumps(results, indent=2, sort_keys=True) + '\n'
+        )
+    if OUTPUT:
+        with open(OUTPUT, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+
+
+@pytest.fixture(scope='module')
+def baseline():
+    if BENCHMARK == 'update' or not BASELINE.exists():
+        return {}
+    return json.loads(BASELINE.read_text())
+
+
+@pytest.mark.parametrize('name', sorted(BENCHMARKS))
+def test_benchmark(name, tmp_path, results, baseline):
+    setup, size = BENCHMARKS[name]
+    small = measure(setup(tmp_path, size // 4), size // 4)
+    result = results[name] = measure(setup(tmp_path, size), size)
+
+    per_item = result['seconds'] / size
+    small_per_item = small['seconds'] / (size // 4)
+    assert per_item <= small_per_item * SCALING_TOLERANCE, (
+        f'{name} takes {per_item / small_per_item:.1f} times longer per item '
+        'with four times the data'
+    )
+
+    expected = baseline.get(name)
+    if expected is None:
+        return
+    assert result['seconds'] <= expected['seconds'] * TIME_TOLERANCE, (
+        f'{name} took {result["seconds"]:.3f}s, '
+        f'baseline is {expected["seconds"]:.3f}s'
+    )
+    assert result['peak_bytes'] <= expected['peak_bytes'] * MEMORY_TOLERANCE, (
+        f'{name} allocated {result["peak_bytes"]} bytes, '
+        f'baseline is {expected["peak_bytes"]}'
+    )
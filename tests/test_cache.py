@@ -0,0 +1,259 @@
+import concurrent.futures
+import os
+import subprocess
+import sys
+import time
+
+import jinja2
+
+from sphinxcontrib.datatemplates import cache, loaders
+
+
+def test_hit_returns_same_data(tmp_path):
+    path = tmp_path / 'data.txt'
+    path.write_text('one')
+    data_cache = cache.DataCache()
+    first = data_cache.get_or_load('key', path, lambda: [path.read_text()])
+    second = data_cache.get_or_load('key', path, lambda: [path.read_text()])
+    assert first is second
+    assert (data_cache.hits, data_cache.misses) == (1, 1)
+
+
+def test_changed_file_is_parsed_again(tmp_path):
+    path = tmp_path / 'data.txt'
+    path.write_text('one')
+    data_cache = cache.DataCache()
+    data_cache.get_or_load('key', path, lambda: [path.read_text()])
+    path.write_text('three')
+    actual = data_cache.get_or_load('key', path, lambda: [path.read_text()])
+    assert actual == ['three']
+    assert len(data_cache) == 1
+
+
+def test_evicts_least_recently_used(tmp_path):
+    path = tmp_path / 'data.txt'
+    path.write_text('x' * 100)
+    data_cache = cache.DataCache(max_bytes=200)
+    data_cache.get_or_load('a', path, lambda: ['a'])
+    data_cache.get_or_load('b', path, lambda: ['b'])
+    data_cache.get_or_load('a', path, lambda: ['a'])
+    data_cache.get_or_load('c', path, lambda: ['c'])
+    assert len(data_cache) == 2
+    assert data_cache.total_bytes <= data_cache.max_bytes
+    data_cache.get_or_load('a', path, lambda: ['a'])
+    assert data_cache.misses == 3
+
+
+def test_size_follows_the_file(tmp_path):
+    path = tmp_path / 'data.txt'
+    path.write_text('x' * 100)
+    data_cache = cache.DataCache()
+    data_cache.get_or_load('key', path, lambda: ['x'] * 10000, size_factor=4)
+    assert data_cache.total_bytes == 400
+
+
+def test_disabled(tmp_path):
+    path = tmp_path / 'data.txt'
+    path.write_text('x')
+    data_cache = cache.DataCache(max_bytes=0)
+    data_cache.get_or_load('key', path, lambda: ['x'])
+    assert len(data_cache) == 0
+
+
+def test_loader_shares_parsed_data(tmp_path):
+    path = tmp_path / 'sample.json'
+    path.write_text('{"key": "value"}')
+    with loaders.load_json('sample.json', str(path)) as first:
+        pass
+    with loaders.load_json('sample.json', os.fspath(path)) as second:
+        pass
+    assert first is second
+    with loaders.load_json('sample.json', str(path), no_cache=True) as third:
+        pass
+    assert third == first
+    assert third is not first
+
+
+def test_loader_options_are_part_of_key(tmp_path):
+    path = tmp_path / 'sample.yaml'
+    path.write_text('key: value\n')
+    with loaders.load_yaml('sample.yaml', str(path)) as single:
+        pass
+    with loaders.load_yaml(
+        'sample.yaml', str(path), multiple_documents=True
+    ) as multiple:
+        pass
+    assert single == {'key': 'value'}
+    assert multiple == [{'key': 'value'}]
+
+
+def test_disk_cache_survives_between_builds(tmp_path):
+    path = tmp_path / 'data.txt'
+    path.write_text('one')
+    calls = []
+
+    def parse():
+        calls.append(1)
+        return [path.read_text()]
+
+    cache.DiskCache(tmp_path / 'cache').get_or_load('key', path, parse)
+    disk_cache = cache.DiskCache(tmp_path / 'cache')
+    actual = disk_cache.get_or_load('key', path, parse)
+    assert actual == ['one']
+    assert len(calls) == 1
+    assert disk_cache.hits == 1
+
+
+def test_disk_cache_ignores_touch(tmp_path):
+    path = tmp_path / 'data.txt'
+    path.write_text('one')
+    disk_cache = cache.DiskCache(tmp_path / 'cache')
+    disk_cache.get_or_load('key', path, lambda: ['one'])
+    os.utime(path, ns=(0, 0))
+    disk_cache.get_or_load('key', path, lambda: ['parsed again'])
+    assert disk_cache.hits == 1
+
+
+def test_disk_cache_replaces_changed_content(tmp_path):
+    path = tmp_path / 'data.txt'
+    path.write_text('one')
+    directory = tmp_path / 'cache'
+    disk_cache = cache.DiskCache(directory)
+    disk_cache.get_or_load('key', path, lambda: [path.read_text()])
+    path.write_text('three')
+    actual = disk_cache.get_or_load('key', path, lambda: [path.read_text()])
+    assert actual == ['three']
+    assert len(list(directory.glob('*' + cache.DiskCache.SUFFIX))) == 1
+
+
+def test_disk_cache_ignores_other_versions(tmp_path, monkeypatch):
+    path = tmp_path / 'data.txt'
+    path.write_text('one')
+    directory = tmp_path / 'cache'
+    cache.DiskCache(directory).get_or_load('key', path, lambda: ['old'])
+    monkeypatch.setattr(cache.version, '__version__', 'other')
+    disk_cache = cache.DiskCache(directory)
+    actual = disk_cache.get_or_load('key', path, lambda: ['new'])
+    assert actual == ['new']
+    assert disk_cache.misses == 1
+
+
+def test_disk_cache_keys_do_not_depend_on_hash_seed():
+    code = (
+        'from sphinxcontrib.datatemplates import cache, loaders\n'
+        "where = loaders._parse_csv_where('a=w|x|y|z, b!=1|2')\n"
+        "print(cache._key_digest(where, frozenset('wxyz'), {'w': 1, 'x': 2}))"
+    )
+    digests = {
+        subprocess.run(
+            [sys.executable, '-c', code],
+            capture_output=True,
+            text=True,
+            check=True,
+            env=dict(os.environ, PYTHONHASHSEED=str(seed)),
+        ).stdout
+        for seed in range(5)
+    }
+    assert len(digests) == 1
+
+
+def test_disk_cache_replaces_corrupt_entries(tmp_path):
+    path = tmp_path / 'data.txt'
+    path.write_text('one')
+    directory = tmp_path / 'cache'
+    cache.DiskCache(directory).get_or_load('key', path, lambda: ['one'])
+    for entry in directory.glob('*' + cache.DiskCache.SUFFIX):
+        entry.write_bytes(entry.read_bytes()[:5])
+    disk_cache = cache.DiskCache(directory)
+    actual = disk_cache.get_or_load('key', path, lambda: ['parsed again'])
+    assert actual == ['parsed again']
+    assert disk_cache.misses == 1
+
+
+def test_disk_cache_collects_garbage(tmp_path):
+    path = tmp_path / 'data.txt'
+    path.write_text('one')
+    directory = tmp_path / 'cache'
+    disk_cache = cache.DiskCache(directory)
+    disk_cache.get_or_load('key', path, lambda: ['one'])
+    disk_cache.collect_garbage()
+    assert list(directory.glob('*' + cache.DiskCache.SUFFIX))
+    for entry in directory.iterdir():
+        os.utime(entry, (0, 0))
+    disk_cache.collect_garbage()
+    assert not list(directory.iterdir())
+
+
+def test_disk_cache_keeps_references_of_used_entries(tmp_path):
+    path = tmp_path / 'data.txt'
+    path.write_text('one')
+    directory = tmp_path / 'cache'
+    disk_cache = cache.DiskCache(directory)
+    disk_cache.get_or_load('key', path, lambda: ['one'])
+    (ref,) = directory.glob('*.ref')
+    os.utime(ref, (0, 0))
+    disk_cache.collect_garbage()
+    assert ref.exists()
+    # The entry for the old content is dropped once it is replaced.
+    path.write_text('three')
+    disk_cache.get_or_load('key', path, lambda: ['three'])
+    assert len(list(directory.glob('*' + cache.DiskCache.SUFFIX))) == 1
+
+
+def test_disk_cache_parses_once_for_concurrent_users(tmp_path):
+    path = tmp_path / 'data.txt'
+    path.write_text('one')
+    calls = []
+
+    def parse():
+        calls.append(1)
+        time.sleep(0.1)
+        return ['one']
+
+    def load():
+        return cache.DiskCache(tmp_path / 'cache').get_or_load('key', path, parse)
+
+    with concurrent.futures.ThreadPoolExecutor(4) as pool:
+        results = list(pool.map(lambda _: load(), range(4)))
+    assert results == [['one']] * 4
+    assert len(calls) == 1
+
+
+def test_template_cache_compiles_once():
+    environment = jinja2.Environment()
+    template_cache = cache.TemplateCache()
+    first = template_cache.get_or_compile(environment, '{{ data }}')
+    second = template_cache.get_or_compile(environment, '{{ data }}')
+    assert first is second
+    assert first.render(data='value') == 'value'
+    assert (template_cache.hits, template_cache.misses) == (1, 1)
+    assert template_cache.compile_seconds > 0
+
+
+def test_template_cache_is_per_environment():
+    template_cache = cache.TemplateCache()
+    first = template_cache.get_or_compile(jinja2.Environment(), '{{ data }}')
+    second = template_cache.get_or_compile(jinja2.Environment(), '{{ data }}')
+    assert first is not second
+
+
+def test_template_cache_evicts_least_recently_used():
+    environment = jinja2.Environment()
+    template_cache = cache.TemplateCache(maxsize=2)
+    for source in ['a', 'b', 'a', 'c']:
+        template_cache.get_or_compile(environment, source)
+    assert len(template_cache) == 2
+    template_cache.get_or_compile(environment, 'a')
+    assert template_cache.misses == 3
+
+
+def test_lru_cache_evicts_least_recently_used():
+    lru_cache = cache.LRUCache(maxsize=2)
+    for key in ['a', 'b', 'a', 'c']:
+        lru_cache.put(key, key.upper())
+    assert len(lru_cache) == 2
+    assert lru_cache.get('a') == 'A'
+    assert lru_cache.get('b') is None
+    lru_cache.put(None, 'ignored')
+    assert lru_cache.get(None) is None
+    assert (lru_cache.hits, lru_cache.misses) == (1, 1)
@@ -0,0 +1,40 @@
+import os
+import time
+
+import pytest
+
+
+def _touch(path):
+    # Newer than the time the documents were read.
+    later = time.time_ns() + 10**10
+    os.utime(path, ns=(later, later))
+
+
+@pytest.mark.sphinx('html', testroot='content-dependencies')
+def test_only_changed_contents_trigger_reading(build):
+    app = build()
+    assert '1 added, 0 changed' in app.status.getvalue()
+    source = app.srcdir / 'sample.json'
+
+    # Regenerated with the same contents.
+    _touch(source)
+    app = build()
+    assert '0 added, 0 changed' in app.status.getvalue()
+
+    source.write_text('{"key": "other"}')
+    app = build()
+    assert '0 added, 1 changed' in app.status.getvalue()
+    assert 'other' in (app.outdir / 'index.html').read_text()
+
+
+@pytest.mark.sphinx(
+    'html',
+    testroot='content-dependencies',
+    confoverrides={'datatemplates_content_dependencies': False},
+)
+def test_disabled(build, app_params):
+    build()
+    source = app_params.kwargs['srcdir'] / 'sample.json'
+    _touch(source)
+    app = build()
+    assert '0 added, 1 changed' in app.status.getvalue()
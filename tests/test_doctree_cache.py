@@ -0,0 +1,31 @@
+from __future__ import annotations
+
+from io import StringIO
+from typing import TYPE_CHECKING
+
+import pytest
+
+if TYPE_CHECKING:
+    from sphinx.testing.util import SphinxTestApp
+
+
+@pytest.mark.sphinx('html', testroot='doctree-cache')
+def test_doctree_cache(app: SphinxTestApp, status: StringIO):
+    # The totals are reported when the build finishes.
+    app.build(force_all=True)
+
+    assert app._warncount == 0, '\n'.join(app.messagelog)
+    # Sections register their ids with the document, so they are
+    # parsed every time.
+    assert (
+        'doctree cache: 1 hits, 1 misses, 2 not cacheable' in status.getvalue()
+    )
+    index = (app.outdir / 'index.html').read_text()
+    other = (app.outdir / 'sub' / 'other.html').read_text()
+    assert index.count('<td><p>3</p></td>') == 1
+    assert other.count('<td><p>3</p></td>') == 1
+    # The copied cross-reference resolves relative to its document.
+    assert '<span class="doc">Page</span></a>.' in index
+    assert '<span class="doc">Sub Page</span></a>.' in other
+    assert 'Section' in other
+    assert '2 rows' in other
@@ -0,0 +1,64 @@
+import subprocess
+import sys
+
+# Upper bound for importing the CLI, in microseconds, with room for
+# slow machines and missing bytecode caches. Importing it took more
+# than 300ms when Sphinx and the format modules were imported
+# eagerly.
+CLI_IMPORT_BUDGET = 200_000
+
+# Modules only needed once a loader for their format is used.
+FORMAT_MODULES = {'dbm', 'defusedxml', 'mmap', 'orjson', 'sqlite3', 'yaml'}
+
+
+def python(*args):
+    result = subprocess.run(
+        [sys.executable, *args], capture_output=True, text=True, check=True
+    )
+    return result
+
+
+def imported_packages(statement):
+    "Return the top-level packages newly imported by ``statement``."
+    result = python(
+        '-c',
+        'import sys\n'
+        'before = set(sys.modules)\n'
+        f'{statement}\n'
+        'print("\\n".join(set(sys.modules) - before))\n',
+    )
+    return {name.partition('.')[0] for name in result.stdout.split()}
+
+
+def import_time(module):
+    "Return the cumulative time to import ``module``, in microseconds."
+    result = python('-X', 'importtime', '-c', f'import {module}')
+    for line in result.stderr.splitlines():
+        _, cumulative, name = line.split('|')
+        if name.strip() == module:
+            return int(cumulative)
+    raise AssertionError(f'{module} was not imported')
+
+
+def test_cli_imports_only_stdlib():
+    packages = imported_packages('import sphinxcontrib.datatemplates.cli')
+    assert packages - set(sys.stdlib_module_names) == {'sphinxcontrib'}
+    assert not packages & (FORMAT_MODULES | {'csv', 'json'})
+
+
+def test_cli_import_time():
+    assert import_time('sphinxcontrib.datatemplates.cli') < CLI_IMPORT_BUDGET
+
+
+def test_package_does_not_import_sphinx():
+    packages = imported_packages('import sphinxcontrib.datatemplates')
+    assert not packages & {'sphinx', 'docutils', 'jinja2'}
+
+
+def test_extension_does_not_import_formats():
+    packages = imported_packages(
+        'import sphinxcontrib.datatemplates.domain\n'
+        'import sphinxcontrib.datatemplates.loaders'
+    )
+    assert 'sphinx' in packages
+    assert not packages & FORMAT_MODULES
@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import pytest
+
+from sphinxcontrib.datatemplates import directive, loaders
+
+if TYPE_CHECKING:
+    from sphinx.testing.util import SphinxTestApp
+
+
+@pytest.mark.sphinx('html', testroot='load')
+def test_load_is_memoized(app: SphinxTestApp):
+    directive.loaded_sources.clear()
+    directive.resolved_loaders.clear()
+    loaders.data_cache.clear()
+    app.builder.build_all()
+
+    assert app._warncount == 0, '\n'.join(app.messagelog)
+    html = (app.outdir / 'index.html').read_text()
+    assert 'AAA' in html
+    assert '<p>A</p>' in html
+    # Streamed rows can be read again after load() returns.
+    assert '12\n12' in html
+    # Files are parsed once and kept in the data cache only.
+    assert loaders.data_cache.hits == 2
+    assert loaders.data_cache.misses == 1
+    assert len(directive.loaded_sources) == 0
+    assert directive.resolved_loaders.hits == 3
+    assert directive.resolved_loaders.misses == 2
+    sources = app.env.get_domain('datatemplate').sources['index']
+    assert sorted(sources) == ['counts.csv', 'parts.json']
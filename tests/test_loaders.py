@@ -1,3 +1,9 @@
+import math
+import pathlib
+
+import pytest
+import yaml
+
 from sphinxcontrib.datatemplates import loaders
 
 
@@ -29,3 +35,179 @@ def test_lookup_csv():
 def test_lookup_dbm():
     actual = loaders.loader_for_source('source.dbm')
     assert actual == loaders.load_dbm
+
+
+def test_lookup_unknown():
+    assert loaders.loader_for_source('source.unknown') is None
+    assert loaders.loader_for_source('source.unknown', default=1) == 1
+
+
+def test_lookup_is_case_insensitive():
+    assert loaders.loader_for_source('SOURCE.CSV') == loaders.load_csv
+
+
+def test_resolve_loader_by_name():
+    actual = loaders.resolve_loader('source.txt', 'yaml')
+    assert actual == loaders.load_yaml
+    assert loaders.resolve_loader('source.json', 'no-such-format') is None
+
+
+def test_registry_keeps_registration_order():
+    entries = []
+    registry = loaders.LoaderRegistry(entries, group='no.such.group')
+    entries.append(
+        loaders.LoaderEntry('custom', 'custom', lambda s: s.startswith('a'))
+    )
+    entries.append(
+        loaders.LoaderEntry(
+            'ext', 'ext', lambda s: s.endswith('.x'), extensions=['.X']
+        )
+    )
+    assert registry.for_source('a.x') == 'custom'
+    assert registry.for_source('b.x') == 'ext'
+    assert registry.for_source('b.y') is None
+    assert registry.by_name('ext') == 'ext'
+
+
+def test_registry_memoizes_resolution():
+    calls = []
+
+    def match(source):
+        calls.append(source)
+        return True
+
+    entries = [loaders.LoaderEntry('custom', 'custom', match)]
+    registry = loaders.LoaderRegistry(entries, group='no.such.group')
+    registry.for_source('a.x')
+    registry.for_source('a.x')
+    assert calls == ['a.x']
+
+
+def test_registry_loads_plugins_on_first_use(monkeypatch):
+    entries = []
+    loaded = []
+
+    class FakeEntryPoint:
+        def __init__(self, name):
+            self.name = name
+            self.value = 'fake.module'
+
+        def load(self):
+            loaded.append(self.name)
+            entries.append(
+                loaders.LoaderEntry(
+                    self.name,
+                    self.name,
+                    lambda s: True,
+                    extensions=['.' + self.name],
+                )
+            )
+
+    monkeypatch.setattr(
+        'importlib.metadata.entry_points',
+        lambda group: [FakeEntryPoint('toml'), FakeEntryPoint('ini')],
+    )
+    registry = loaders.LoaderRegistry(entries)
+    assert loaded == []
+    assert registry.by_name('ini') == 'ini'
+    assert loaded == ['ini']
+    assert registry.for_source('source.toml') == 'toml'
+    assert loaded == ['ini', 'toml']
+
+
+def test_registry_reports_broken_plugin(monkeypatch):
+    class BrokenEntryPoint:
+        name = 'broken'
+        value = 'broken.module'
+
+        def load(self):
+            raise ImportError('no module named broken')
+
+    monkeypatch.setattr(
+        'importlib.metadata.entry_points',
+        lambda group: [BrokenEntryPoint()],
+    )
+    registry = loaders.LoaderRegistry([])
+    with pytest.raises(loaders.LoaderError, match='broken'):
+        registry.for_source('source.broken')
+
+
+def test_parser_backend_selection():
+    loaders.select_parser_backends({'yaml': 'python'})
+    try:
+        assert loaders.parser_backend('yaml') == ('python', yaml.SafeLoader)
+    finally:
+        loaders.select_parser_backends({})
+
+
+def test_parser_backend_unknown():
+    with pytest.raises(ValueError):
+        loaders.select_parser_backends({'yaml': 'no-such-backend'})
+    with pytest.raises(ValueError):
+        loaders.select_parser_backends({'no-such-format': 'auto'})
+
+
+def test_parser_backend_fallback(monkeypatch):
+    def missing():
+        raise ImportError('missing')
+
+    monkeypatch.setitem(
+        loaders.parser_backends,
+        'json',
+        {'missing': missing, 'stdlib': loaders._stdlib_json_backend},
+    )
+    loaders.select_parser_backends({'json': 'missing'})
+    try:
+        name, _ = loaders.parser_backend('json')
+        assert name == 'stdlib'
+    finally:
+        loaders.select_parser_backends({})
+
+
+def test_json_default_backend_keeps_values(tmp_path):
+    # The default is the stdlib, whatever else is installed.
+    assert loaders.parser_backend('json')[0] == 'stdlib'
+    path = tmp_path / 'values.json'
+    path.write_text('[123456789012345678901234567890, NaN]')
+    with loaders.load_json('values.json', path, no_cache=True) as data:
+        assert data[0] == 123456789012345678901234567890
+        assert math.isnan(data[1])
+
+
+def test_json_rejected_input_falls_back_to_stdlib(tmp_path):
+    pytest.importorskip('orjson')
+    path = tmp_path / 'values.json'
+    path.write_text('{"a": NaN}')
+    loaders.select_parser_backends({'json': 'orjson'})
+    try:
+        with loaders.load_json('values.json', path, no_cache=True) as data:
+            assert math.isnan(data['a'])
+        path.write_text('{"a": }')
+        with pytest.raises(loaders.LoaderError, match='Expecting value'):
+            with loaders.load_json('values.json', path, no_cache=True):
+                pass
+    finally:
+        loaders.select_parser_backends({})
+
+
+@pytest.mark.parametrize('backend', ['python', 'libyaml'])
+def test_yaml_error_names_source(backend):
+    if backend == 'libyaml' and not yaml.__with_libyaml__:
+        pytest.skip('libyaml is not available')
+    source = 'sample.yaml'
+    abs_path = str(
+        (
+            pathlib.Path('tests') / 'testdata' / 'test-incorrect-yaml-syntax' / source
+        ).resolve()
+    )
+    loaders.select_parser_backends({'yaml': backend})
+    try:
+        with pytest.raises(loaders.LoaderError) as excinfo:
+            with loaders.load_yaml(source, abs_path, no_cache=True):
+                pass
+    finally:
+        loaders.select_parser_backends({})
+    assert 'in "sample.yaml", line 12, column 3' in str(excinfo.value)
+    assert abs_path not in str(excinfo.value)
+    # The same message as the pure Python parser gives.
+    assert "expected <block end>, but found '?'" in str(excinfo.value)
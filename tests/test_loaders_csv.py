@@ -1,5 +1,8 @@
+import csv
 import pathlib
 
+import pytest
+
 from sphinxcontrib.datatemplates import loaders
 
 
@@ -13,3 +16,227 @@ def test_load_csv():
     with loaders.load_csv(source, abs_path, dialect='excel-tab') as data:
         assert len(data) == 4
         assert data[0] == ['a', 'b', 'c']
+
+
+def test_load_csv_stream():
+    source = 'sample.csv'
+    abs_path = get_source_path(source)
+    with loaders.load_csv(
+        source, abs_path, dialect='excel-tab', stream=True
+    ) as data:
+        assert isinstance(data, loaders.CSVRows)
+        assert list(data)[0] == ['a', 'b', 'c']
+        # the rows can be read more than once
+        assert len(list(data)) == 4
+
+
+def test_load_csv_stream_headers():
+    source = 'sample.csv'
+    abs_path = get_source_path(source)
+    with loaders.load_csv(
+        source, abs_path, headers=True, dialect='auto', stream=True
+    ) as data:
+        rows = list(data)
+    assert len(rows) == 3
+    assert list(rows[0].keys()) == ['a', 'b', 'c']
+
+
+def test_load_csv_stream_closes_file():
+    source = 'sample.csv'
+    abs_path = get_source_path(source)
+    with loaders.load_csv(
+        source, abs_path, dialect='excel-tab', stream=True
+    ) as data:
+        rows = iter(data)
+        next(rows)
+    with pytest.raises(ValueError):
+        next(rows)
+
+
+def test_load_csv_stream_threshold(monkeypatch):
+    source = 'sample.csv'
+    abs_path = get_source_path(source)
+    monkeypatch.setattr(loaders, 'csv_stream_threshold', 1)
+    with loaders.load_csv(source, abs_path, dialect='excel-tab') as data:
+        assert isinstance(data, loaders.CSVRows)
+
+
+def test_load_csv_columns_headers():
+    source = 'sample.csv'
+    abs_path = get_source_path(source)
+    with loaders.load_csv(
+        source, abs_path, headers=True, dialect='excel-tab', columns='c, a'
+    ) as data:
+        assert data[0] == {'c': 'Drei', 'a': 'Eins'}
+        assert all(list(row) == ['c', 'a'] for row in data)
+
+
+def test_load_csv_where_headers():
+    source = 'sample.csv'
+    abs_path = get_source_path(source)
+    with loaders.load_csv(
+        source, abs_path, headers=True, dialect='excel-tab', where='a!=Eins'
+    ) as data:
+        assert [row['a'] for row in data] == ['1', 'I']
+
+
+def test_load_csv_where_alternatives():
+    source = 'sample.csv'
+    abs_path = get_source_path(source)
+    with loaders.load_csv(
+        source,
+        abs_path,
+        headers=True,
+        dialect='excel-tab',
+        columns='b',
+        where='a=1|I',
+    ) as data:
+        assert data == [{'b': '2'}, {'b': 'II'}]
+
+
+def test_load_csv_where_keeps_extra_fields(tmp_path):
+    path = tmp_path / 'ragged.csv'
+    path.write_text('a,b\n1,2,3,4\n5\n1,6\n')
+    with open(path, newline='') as f:
+        expected = [row for row in csv.DictReader(f) if row['a'] == '1']
+    with loaders.load_csv(
+        'ragged.csv', str(path), headers=True, where='a=1'
+    ) as data:
+        assert data == expected
+    assert expected[0][None] == ['3', '4']
+
+
+def test_load_csv_columns_indexes():
+    source = 'sample.csv'
+    abs_path = get_source_path(source)
+    with loaders.load_csv(
+        source, abs_path, dialect='excel-tab', columns='2', where='0=1'
+    ) as data:
+        assert data == [['3']]
+
+
+def test_load_csv_unknown_column():
+    source = 'sample.csv'
+    abs_path = get_source_path(source)
+    with pytest.raises(loaders.LoaderError):
+        with loaders.load_csv(
+            source, abs_path, headers=True, dialect='excel-tab', columns='d'
+        ):
+            pass
+
+
+def test_load_csv_stream_columns():
+    source = 'sample.csv'
+    abs_path = get_source_path(source)
+    with loaders.load_csv(
+        source,
+        abs_path,
+        headers=True,
+        dialect='excel-tab',
+        columns='a',
+        where='c=3',
+        stream=True,
+    ) as data:
+        assert list(data) == [{'a': '1'}]
+
+
+@pytest.mark.parametrize(
+    'rows, expected',
+    [
+        ('0', [['Eins', 'Zwei', 'Drei']]),
+        ('-1', [['I', 'II', 'III']]),
+        ('1:', [['1', '2', '3'], ['I', 'II', 'III']]),
+        ('0:1, -1:', [['Eins', 'Zwei', 'Drei'], ['I', 'II', 'III']]),
+        ('10:', []),
+    ],
+)
+def test_load_csv_rows(rows, expected):
+    source = 'sample.csv'
+    abs_path = get_source_path(source)
+    with loaders.load_csv(
+        source, abs_path, headers=True, dialect='excel-tab', rows=rows
+    ) as data:
+        assert [list(row.values()) for row in data] == expected
+
+
+def test_load_csv_rows_without_headers():
+    source = 'sample.csv'
+    abs_path = get_source_path(source)
+    with loaders.load_csv(
+        source, abs_path, dialect='excel-tab', rows='0, -1'
+    ) as data:
+        assert data == [['a', 'b', 'c'], ['I', 'II', 'III']]
+
+
+def test_load_csv_rows_quoted_line_ends(tmp_path):
+    path = tmp_path / 'quoted.csv'
+    path.write_text(
+        'name,note\r\n'
+        'a,"two\r\nlines"\r\n'
+        '\r\n'
+        'b,"say ""hi""\nthere"\r\n'
+        'c,plain\r\n',
+        newline='',
+    )
+    with loaders.load_csv('quoted.csv', path, headers=True, rows='1:') as data:
+        assert data == [
+            {'name': 'b', 'note': 'say "hi"\nthere'},
+            {'name': 'c', 'note': 'plain'},
+        ]
+
+
+def test_load_csv_rows_quotes_inside_fields(tmp_path):
+    # Only a quote at the start of a field opens a quoted field.
+    path = tmp_path / 'inches.csv'
+    path.write_text(
+        'h1,h2\na"b,c\nd,e\n12" pipe,"x\ny"z\n"q""",f\ng,h\n',
+        newline='',
+    )
+    with open(path, newline='') as f:
+        expected = list(csv.reader(f))
+    with loaders.load_csv('inches.csv', path, rows='-1') as data:
+        assert data == [['g', 'h']]
+    with loaders.load_csv('inches.csv', path, rows='1:') as data:
+        assert data == expected[1:]
+    with loaders.load_csv(
+        'inches.csv', path, headers=True, rows='1:'
+    ) as data:
+        assert data == [dict(zip(expected[0], r)) for r in expected[2:]]
+
+
+def test_load_csv_rows_escapechar(tmp_path):
+    # Escaped quotes cannot be indexed, so the whole file is parsed.
+    class Escaped(csv.excel):
+        escapechar = '\\'
+        doublequote = False
+
+    csv.register_dialect('test-escaped', Escaped)
+    try:
+        path = tmp_path / 'escaped.csv'
+        path.write_text('a,"x\\",\n"\nb,y\n', newline='')
+        with loaders.load_csv(
+            'escaped.csv', path, dialect='test-escaped', rows='-1'
+        ) as data:
+            assert data == [['b', 'y']]
+    finally:
+        csv.unregister_dialect('test-escaped')
+
+
+def test_load_csv_rows_with_where():
+    source = 'sample.csv'
+    abs_path = get_source_path(source)
+    with loaders.load_csv(
+        source,
+        abs_path,
+        headers=True,
+        dialect='excel-tab',
+        columns='a',
+        where='a!=1',
+        rows='1:',
+    ) as data:
+        assert data == [{'a': 'I'}]
+
+
+def test_load_csv_rows_invalid():
+    with pytest.raises(loaders.LoaderError, match='invalid rows'):
+        loaders._parse_csv_rows_option('1:2:3')
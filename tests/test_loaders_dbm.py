@@ -0,0 +1,65 @@
+import dbm.dumb
+
+import pytest
+
+from sphinxcontrib.datatemplates import loaders
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = tmp_path / 'sample'
+    with dbm.dumb.open(str(path), 'c') as db:
+        db[b'b'] = b'two'
+        db[b'a'] = b'one'
+        db[b'c'] = b'three'
+    yield str(path)
+    loaders.dbm_handles.close_all()
+
+
+def test_handle_is_shared_and_stays_open(db_path):
+    with loaders.load_dbm('sample', db_path) as first:
+        pass
+    with loaders.load_dbm('sample', db_path) as second:
+        pass
+    assert first is second
+    assert first['a'] == b'one'
+    assert loaders.dbm_handles.opened == 1
+
+
+def test_close_all(db_path):
+    with loaders.load_dbm('sample', db_path) as data:
+        pass
+    loaders.dbm_handles.close_all()
+    assert len(loaders.dbm_handles) == 0
+    with loaders.load_dbm('sample', db_path) as reopened:
+        assert reopened is not data
+        assert reopened['b'] == b'two'
+
+
+def test_no_cache_closes_handle(db_path):
+    with loaders.load_dbm('sample', db_path, no_cache=True) as data:
+        assert data['c'] == b'three'
+    assert len(loaders.dbm_handles) == 0
+    with pytest.raises(Exception):
+        data['c']
+
+
+def test_prefetch(db_path):
+    with loaders.load_dbm('sample', db_path) as data:
+        values = data.prefetch(['a', b'c', 'missing'])
+    assert values == {'a': b'one', b'c': b'three'}
+    assert data.prefetch() == {b'a': b'one', b'b': b'two', b'c': b'three'}
+
+
+def test_sorted_keys(db_path):
+    with loaders.load_dbm('sample', db_path) as data:
+        assert data.sorted_keys() == [b'a', b'b', b'c']
+
+
+def test_forked_process_opens_own_handle(db_path, monkeypatch):
+    with loaders.load_dbm('sample', db_path) as parent:
+        pass
+    monkeypatch.setattr('os.getpid', lambda: -1)
+    with loaders.load_dbm('sample', db_path) as child:
+        pass
+    assert child is not parent
@@ -0,0 +1,92 @@
+import codecs
+import json
+
+import pytest
+
+from sphinxcontrib.datatemplates import loaders
+
+RECORDS = [
+    {'id': 3, 'name': 'c'},
+    {'id': 1, 'name': 'a'},
+    {'name': 'no id'},
+    {'id': 2, 'name': 'b'},
+    {'id': 1, 'name': 'a again'},
+]
+
+
+@pytest.fixture
+def path(tmp_path):
+    path = tmp_path / 'records.jsonl'
+    path.write_text(
+        '\n'.join(json.dumps(r) for r in RECORDS[:3])
+        + '\n\n'
+        + '\n'.join(json.dumps(r) for r in RECORDS[3:])
+        + '\n'
+    )
+    return path
+
+
+def test_lookup_jsonl():
+    assert loaders.loader_for_source('source.jsonl') == loaders.load_jsonl
+    assert loaders.loader_for_source('source.ndjson') == loaders.load_jsonl
+
+
+def test_iterates_records(path):
+    with loaders.load_jsonl('records.jsonl', path) as data:
+        assert list(data) == RECORDS
+        assert list(data) == RECORDS
+
+
+def test_byte_order_mark(tmp_path):
+    path = tmp_path / 'records.jsonl'
+    path.write_bytes(codecs.BOM_UTF8 + b'{"id": 1}\n{"id": 2}\n')
+    with loaders.load_jsonl('records.jsonl', path, index_key='id') as data:
+        assert list(data) == [{'id': 1}, {'id': 2}]
+        assert data.get(1) == {'id': 1}
+
+
+def test_index_lookup(path):
+    with loaders.load_jsonl('records.jsonl', path, index_key='id') as data:
+        assert data.get(2) == {'id': 2, 'name': 'b'}
+        assert data.get(5) is None
+        assert [r['name'] for r in data.get_all(1)] == ['a', 'a again']
+        assert data.keys() == [1, 2, 3]
+        assert 3 in data
+        assert 4 not in data
+
+
+def test_index_range(path):
+    with loaders.load_jsonl('records.jsonl', path, index_key='id') as data:
+        assert [r['name'] for r in data.range(2)] == ['b', 'c']
+        assert [r['name'] for r in data.range(1, 3)] == ['a', 'a again', 'b']
+        assert [r['name'] for r in data.range(stop=2)] == ['a', 'a again']
+
+
+def test_index_is_cached(path):
+    with loaders.load_jsonl('records.jsonl', path, index_key='id') as first:
+        pass
+    with loaders.load_jsonl('records.jsonl', path, index_key='id') as second:
+        pass
+    assert first._index is second._index
+
+
+def test_lookup_requires_index(path):
+    with loaders.load_jsonl('records.jsonl', path) as data:
+        with pytest.raises(loaders.LoaderError, match='index-key'):
+            data.get(1)
+
+
+def test_invalid_record(tmp_path):
+    path = tmp_path / 'records.jsonl'
+    path.write_text('{"id": 1}\n{"id": \n')
+    with loaders.load_jsonl('records.jsonl', path) as data:
+        with pytest.raises(loaders.LoaderError, match='line 2'):
+            list(data)
+
+
+def test_uncomparable_index_values(tmp_path):
+    path = tmp_path / 'records.jsonl'
+    path.write_text('{"id": 1}\n{"id": "one"}\n')
+    with pytest.raises(loaders.LoaderError, match='cannot be compared'):
+        with loaders.load_jsonl('records.jsonl', path, index_key='id'):
+            pass
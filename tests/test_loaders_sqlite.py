@@ -0,0 +1,93 @@
+import sqlite3
+
+import pytest
+
+from sphinxcontrib.datatemplates import loaders
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = tmp_path / 'sample.sqlite'
+    with sqlite3.connect(path) as db:
+        db.execute(
+            'CREATE TABLE part (name TEXT, family TEXT, quantity INTEGER)'
+        )
+        db.executemany(
+            'INSERT INTO part VALUES (?, ?, ?)',
+            [('bolt', 'X', 10), ('nut', 'X', 30), ('hinge', 'Y', 5)],
+        )
+    db.close()
+    yield str(path)
+    loaders.sqlite_connections.close_all()
+
+
+def test_lookup_sqlite():
+    for source in ['source.db', 'source.sqlite', 'source.sqlite3']:
+        assert loaders.loader_for_source(source) == loaders.load_sqlite
+
+
+def test_query_with_params(db_path):
+    with loaders.load_sqlite(
+        'sample.sqlite',
+        db_path,
+        query='SELECT name FROM part WHERE family = :family ORDER BY name',
+        params='family=X',
+    ) as data:
+        assert [row['name'] for row in data] == ['bolt', 'nut']
+        # Iterating again runs the query again.
+        assert [row[0] for row in data] == ['bolt', 'nut']
+
+
+def test_query_aggregates(db_path):
+    with loaders.load_sqlite(
+        'sample.sqlite',
+        db_path,
+        query='SELECT sum(quantity) FROM part WHERE quantity >= :minimum',
+        params='minimum=10',
+    ) as data:
+        assert [row[0] for row in data] == [40]
+
+
+def test_query_method(db_path):
+    with loaders.load_sqlite('sample.sqlite', db_path) as data:
+        rows = data.query('SELECT name FROM part WHERE family = :f', f='Y')
+        assert [row['name'] for row in rows] == ['hinge']
+
+
+def test_connection_is_shared(db_path):
+    with loaders.load_sqlite('sample.sqlite', db_path) as first:
+        pass
+    with loaders.load_sqlite('sample.sqlite', db_path) as second:
+        pass
+    assert first._connection is second._connection
+    assert loaders.sqlite_connections.opened == 1
+
+
+def test_read_only(db_path):
+    with loaders.load_sqlite(
+        'sample.sqlite', db_path, query="DELETE FROM part"
+    ) as data:
+        with pytest.raises(loaders.LoaderError, match='readonly'):
+            list(data)
+
+
+def test_query_error(db_path):
+    with loaders.load_sqlite(
+        'sample.sqlite', db_path, query='SELECT * FROM missing'
+    ) as data:
+        with pytest.raises(loaders.LoaderError, match='no such table'):
+            list(data)
+
+
+def test_invalid_params(db_path):
+    with pytest.raises(loaders.LoaderError, match='invalid parameter'):
+        with loaders.load_sqlite(
+            'sample.sqlite', db_path, query='SELECT 1', params='family'
+        ):
+            pass
+
+
+def test_missing_file(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        with loaders.load_sqlite('missing.db', str(tmp_path / 'missing.db')):
+            pass
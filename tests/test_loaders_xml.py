@@ -0,0 +1,110 @@
+import pathlib
+
+import pytest
+
+from sphinxcontrib.datatemplates import loaders
+
+
+def get_source_path(source):
+    return (pathlib.Path('doc') / 'source' / source).resolve()
+
+
+def select(path, **options):
+    with loaders.load_xml(
+        'sample.xml', path, no_cache=True, **options
+    ) as data:
+        return data
+
+
+def test_select_relative_to_root():
+    data = select(get_source_path('sample.xml'), select='key2/item')
+    assert [e.text for e in data] == [
+        'list item 1',
+        'list item 2',
+        'list item 3',
+    ]
+
+
+def test_select_attribute_predicate():
+    data = select(
+        get_source_path('sample.xml'),
+        select="/sample/key2/item[@special='yes']",
+    )
+    assert [e.text for e in data] == ['list item 3']
+
+
+def test_select_descendants():
+    data = select(get_source_path('sample.xml'), select='//*[@special]')
+    assert [e.tag for e in data] == ['item', 'cola', 'colb']
+
+
+def test_select_keeps_children_of_matches():
+    data = select(get_source_path('sample.xml'), select='//mapping')
+    assert [[child.text for child in e] for e in data] == [
+        ['a', 'b', 'c'],
+        ['A', 'B', 'C'],
+    ]
+
+
+def test_select_nested_matches_in_document_order():
+    data = select(get_source_path('sample.xml'), select='//*', as_dict=True)
+    assert data[0]['tag'] == 'sample'
+    assert [e['tag'] for e in data[1:4]] == ['key1', 'key2', 'item']
+    assert data[2]['children'][0] == data[3]
+
+
+def test_as_dict():
+    data = select(
+        get_source_path('sample.xml'), select='//mapping', as_dict=True
+    )
+    assert data[0] == {
+        'tag': 'mapping',
+        'attrib': {},
+        'text': None,
+        'tail': None,
+        'children': [
+            {
+                'tag': 'cola',
+                'attrib': {'special': 'yes'},
+                'text': 'a',
+                'tail': None,
+                'children': [],
+            },
+            {
+                'tag': 'colb',
+                'attrib': {},
+                'text': 'b',
+                'tail': None,
+                'children': [],
+            },
+            {
+                'tag': 'colc',
+                'attrib': {},
+                'text': 'c',
+                'tail': None,
+                'children': [],
+            },
+        ],
+    }
+
+
+def test_as_dict_without_select():
+    data = select(get_source_path('sample.xml'), as_dict=True)
+    assert data['tag'] == 'sample'
+    assert [child['tag'] for child in data['children']] == [
+        'key1',
+        'key2',
+        'mappingseries',
+    ]
+
+
+def test_invalid_predicate():
+    with pytest.raises(loaders.LoaderError, match='invalid predicate'):
+        select(get_source_path('sample.xml'), select='//mapping[cola="a"]')
+
+
+def test_parse_error(tmp_path):
+    path = tmp_path / 'broken.xml'
+    path.write_text('<root><item></root>')
+    with pytest.raises(loaders.LoaderError, match='mismatched tag'):
+        select(path, select='//item')
@@ -0,0 +1,118 @@
+import pathlib
+
+import pytest
+import yaml
+
+from sphinxcontrib.datatemplates import loaders
+
+
+def get_source_path(source):
+    return (pathlib.Path('doc') / 'source' / source).resolve()
+
+
+def write_documents(tmp_path, count):
+    path = tmp_path / 'documents.yaml'
+    path.write_text(
+        ''.join(
+            '---\nname: doc{0}\nindex: {0}\n'.format(i) for i in range(count)
+        )
+    )
+    return path
+
+
+def test_multiple_documents_match_load_all():
+    source = 'sample-multiple.yaml'
+    abs_path = get_source_path(source)
+    with open(abs_path, encoding='utf-8-sig') as f:
+        expected = list(yaml.safe_load_all(f))
+    with loaders.load_yaml(source, abs_path, multiple_documents=True) as data:
+        assert isinstance(data, loaders.YAMLDocuments)
+        assert len(data) == len(expected)
+        assert data == expected
+
+
+def test_multiple_documents_parsed_on_access(tmp_path):
+    path = write_documents(tmp_path, 5)
+    with loaders.load_yaml(
+        'documents.yaml', path, multiple_documents=True, no_cache=True
+    ) as data:
+        assert data[3] == {'name': 'doc3', 'index': 3}
+        parsed = [d for d in data._stream.documents if isinstance(d, dict)]
+        assert len(parsed) == 1
+
+
+def test_documents_index(tmp_path):
+    path = write_documents(tmp_path, 5)
+    with loaders.load_yaml('documents.yaml', path, documents='-1') as data:
+        assert data == {'name': 'doc4', 'index': 4}
+
+
+def test_documents_range(tmp_path):
+    path = write_documents(tmp_path, 5)
+    with loaders.load_yaml('documents.yaml', path, documents='1:3') as data:
+        assert [d['index'] for d in data] == [1, 2]
+
+
+def test_documents_key(tmp_path):
+    path = tmp_path / 'documents.yaml'
+    path.write_text(
+        '---\nname: doc0\n---\ntitle: doc1\n---\nname: doc2\n'
+        '---\ntitle: doc3\n'
+    )
+    with loaders.load_yaml(
+        'documents.yaml', path, documents='name=doc2', no_cache=True
+    ) as data:
+        assert list(data) == [{'name': 'doc2'}]
+        # Documents without the key are not parsed.
+        parsed = [d for d in data._stream.documents if isinstance(d, dict)]
+        assert len(parsed) == 2
+
+
+@pytest.mark.parametrize('encoding', ['utf-8', 'utf-16'])
+@pytest.mark.parametrize(
+    'selection',
+    ['enabled=True', 'version=16', 'name=tab\there', 'name=é'],
+)
+def test_documents_key_spelled_differently(tmp_path, encoding, selection):
+    # Values written another way in YAML match the same with and
+    # without the index, which UTF-16 files cannot have.
+    path = tmp_path / 'documents.yaml'
+    path.write_text(
+        '---\nenabled: true\nversion: 0x10\nname: "tab\\there"\n'
+        '---\nenabled: false\nversion: 8\nname: "\\u00e9"\n',
+        encoding=encoding,
+    )
+    expected = {
+        'enabled=True': [0],
+        'version=16': [0],
+        'name=tab\there': [0],
+        'name=é': [1],
+    }[selection]
+    with loaders.load_yaml(
+        'documents.yaml',
+        path,
+        documents=selection,
+        encoding=encoding,
+        no_cache=True,
+    ) as data:
+        assert data._indexes == expected
+
+
+def test_documents_index_out_of_range(tmp_path):
+    path = write_documents(tmp_path, 2)
+    with pytest.raises(loaders.LoaderError):
+        with loaders.load_yaml('documents.yaml', path, documents='5'):
+            pass
+
+
+def test_documents_error_line(tmp_path):
+    path = tmp_path / 'documents.yaml'
+    path.write_text('---\na: 1\n---\nb: [1,\n---\nc: 3\n')
+    with loaders.load_yaml(
+        'documents.yaml', path, multiple_documents=True, no_cache=True
+    ) as data:
+        assert data[2] == {'c': 3}
+        with pytest.raises(loaders.LoaderError) as excinfo:
+            data[1]
+    # the same line a full parse reports
+    assert 'in "documents.yaml", line 5' in str(excinfo.value)
@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+from io import StringIO
+from typing import TYPE_CHECKING
+
+import pytest
+
+from sphinxcontrib.datatemplates import loaders, prefetch
+
+if TYPE_CHECKING:
+    from sphinx.testing.util import SphinxTestApp
+
+
+def test_scan():
+    text = '\n'.join(
+        [
+            'Title',
+            '=====',
+            '',
+            '.. datatemplate:csv:: data/sample.csv',
+            '   :headers:',
+            '   :dialect: excel-tab',
+            '   :where: a=1,',
+            '      b=2',
+            '',
+            '   {{ data }}',
+            '',
+            '```{datatemplate:yaml}',
+            ':source: sample.yaml',
+            '```',
+        ]
+    )
+    assert list(prefetch.scan(text)) == [
+        (
+            'csv',
+            'data/sample.csv',
+            {'headers': '', 'dialect': 'excel-tab', 'where': 'a=1, b=2'},
+        ),
+        ('yaml', '', {'source': 'sample.yaml'}),
+    ]
+
+
+def test_load_skips_sources_the_directive_reports(tmp_path):
+    path = tmp_path / 'broken.json'
+    path.write_text('{')
+    options = {
+        'source': 'broken.json',
+        'relative_resolved_path': 'broken.json',
+        'absolute_resolved_path': str(path),
+        'no_cache': True,
+    }
+    assert not prefetch._load(loaders.load_json, options)
+    missing = dict(options, absolute_resolved_path=str(tmp_path / 'missing'))
+    assert not prefetch._load(loaders.load_json, missing)
+
+
+def test_load_raises_other_errors():
+    def broken(**options):
+        raise KeyError('bug')
+
+    with pytest.raises(KeyError):
+        prefetch._load(broken, {'relative_resolved_path': 'x'})
+
+
+@pytest.mark.sphinx('html', testroot='prefetch')
+def test_prefetch(app: SphinxTestApp, status: StringIO):
+    app.builder.build_all()
+
+    assert app._warncount == 0, '\n'.join(app.messagelog)
+    # The JSON file is used twice with the same options, and the
+    # streamed CSV file is not parsed up front.
+    assert 'prefetched 2 of 2 sources' in status.getvalue()
@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import pstats
+from io import StringIO
+from typing import TYPE_CHECKING
+
+import jinja2
+import pytest
+
+from sphinxcontrib.datatemplates import profiling
+
+if TYPE_CHECKING:
+    from sphinx.testing.util import SphinxTestApp
+
+
+def test_matches():
+    patterns = ['reference/*', '*.csv']
+    assert profiling.matches(patterns, 'reference/api', 'data.json')
+    assert profiling.matches(patterns, 'index', 'data/sample.csv')
+    assert not profiling.matches(patterns, 'index', '')
+
+
+def test_template_lines():
+    environment = jinja2.Environment(
+        loader=jinja2.DictLoader(
+            {'loop.tmpl': 'start\n{% for i in data %}\n{{ i }}\n{% endfor %}\n'}
+        )
+    )
+    template = environment.get_template('loop.tmpl')
+    with profiling.DirectiveProfiler() as profiler:
+        template.render(data=range(10))
+    lines = {line: hits for _, line, hits, _ in profiler.hot_lines(count=10)}
+    assert lines[3] >= 10
+    keys = profiler.stats().stats
+    assert ('loop.tmpl', 3, 'line') in keys
+    assert ('loop.tmpl', 1, 'root (template)') in keys
+
+
+@pytest.mark.sphinx('html', testroot='profile')
+def test_profile(app: SphinxTestApp, status: StringIO):
+    app.builder.build_all()
+
+    assert app._warncount == 0, '\n'.join(app.messagelog)
+    directory = app.outdir / profiling.PROFILE_DIRECTORY
+    assert sorted(p.name for p in directory.iterdir()) == [
+        'index-8.pstats',
+        'other-4.pstats',
+    ]
+    stats = pstats.Stats(str(directory / 'index-8.pstats'))
+    assert any(
+        label.endswith('items.tmpl') and name == 'line'
+        for label, _, name in stats.stats
+    )
+    assert 'profile of index:8 written to' in status.getvalue()
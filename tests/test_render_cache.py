@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+from io import StringIO
+from typing import TYPE_CHECKING
+
+import jinja2
+import pytest
+
+from sphinxcontrib.datatemplates import directive
+
+if TYPE_CHECKING:
+    from sphinx.testing.util import SphinxTestApp
+
+
+def test_fingerprint_follows_includes(make_templates):
+    templates = make_templates(
+        jinja2.DictLoader({'a.tmpl': '{% include "b.tmpl" %}', 'b.tmpl': 'B'})
+    )
+    first = directive._resolve_templates(templates, 'a.tmpl')[1]
+    templates.environment.loader.mapping['b.tmpl'] = 'changed'
+    assert directive._resolve_templates(templates, 'a.tmpl')[1] != first
+
+
+@pytest.mark.parametrize(
+    'source',
+    [
+        '{{ env.docname }}',
+        '{{ load("other.json") }}',
+        '{% include "env.tmpl" %}',
+        '{% include name %}',
+    ],
+)
+def test_fingerprint_rejects_per_document_templates(make_templates, source):
+    templates = make_templates(
+        jinja2.DictLoader({'env.tmpl': '{{ env.docname }}'})
+    )
+    _, fingerprint = directive._resolve_templates(templates, None, source)
+    assert fingerprint is None
+
+
+@pytest.mark.sphinx('html', testroot='render-cache')
+def test_render_cache(app: SphinxTestApp, status: StringIO):
+    # The totals are reported when the build finishes.
+    app.build(force_all=True)
+
+    assert app._warncount == 0, '\n'.join(app.messagelog)
+    assert (
+        'render cache: 2 hits, 2 misses, 2 not cacheable' in status.getvalue()
+    )
+    for docname in ['index', 'other']:
+        html = (app.outdir / f'{docname}.html').read_text()
+        assert 'Key is value' in html
+        assert 'Inline value' in html
+        assert f'Document {docname}' in html
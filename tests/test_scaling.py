@@ -0,0 +1,52 @@
+import os
+
+import pytest
+
+import scaling
+
+
+def _result(pages, jobs=1, seconds=1.0, parsed=10):
+    return {
+        'pages': pages,
+        'directives': 5,
+        'rows': 100,
+        'jobs': jobs,
+        'seconds': seconds,
+        'directive_seconds': seconds / 2,
+        'max_rss_kb': 100_000,
+        'parsed': parsed,
+    }
+
+
+def test_linear_growth_is_not_reported():
+    results = [_result(10, seconds=1.0), _result(40, seconds=4.0)]
+    assert scaling.analyze(results) == []
+
+
+def test_super_linear_growth_is_reported():
+    results = [_result(10, seconds=1.0), _result(40, seconds=16.0)]
+    problems = scaling.analyze(results)
+    assert len(problems) == 2
+    assert problems[0].startswith('seconds grows as pages^2.00 from 10 to 40')
+
+
+def test_parsing_again_in_workers_is_reported():
+    results = [_result(10, jobs=1, parsed=10), _result(10, jobs=4, parsed=25)]
+    (problem,) = scaling.analyze(results)
+    assert problem.startswith('25 sources parsed with -j 4 and 10 with -j 1')
+
+
+def test_curves_only_vary_one_dimension():
+    results = [_result(10), _result(20), _result(10, jobs=2)]
+    curves = scaling.curves(results)
+    assert sorted(dimension for dimension, _ in curves) == ['jobs', 'pages']
+
+
+@pytest.mark.skipif(
+    not os.environ.get('DATATEMPLATES_BENCHMARK'),
+    reason='set DATATEMPLATES_BENCHMARK to run the benchmarks',
+)
+def test_build_scaling(tmp_path):
+    results = scaling.run_grid(tmp_path, [10, 40], [5], [100], [1, 2])
+    print(scaling.format_table(results))
+    assert scaling.analyze(results) == []
@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import json
+import tracemalloc
+from io import StringIO
+from typing import TYPE_CHECKING
+
+import pytest
+
+from sphinxcontrib.datatemplates import stats
+
+if TYPE_CHECKING:
+    from sphinx.testing.util import SphinxTestApp
+
+
+def _record(load, render, parse):
+    return {
+        'load_seconds': load,
+        'render_seconds': render,
+        'parse_seconds': parse,
+        'lines': 1,
+        'parsed': 1,
+    }
+
+
+def test_build_report_sorts_slowest_first():
+    report = stats.build_report(
+        [_record(1, 0, 0), _record(0, 2, 1), _record(0, 0, 2)]
+    )
+    assert [stats.total_seconds(r) for r in report['directives']] == [3, 2, 1]
+    assert report['totals'] == {
+        'directives': 3,
+        'load_seconds': 1,
+        'render_seconds': 2,
+        'parse_seconds': 3,
+        'lines': 3,
+        'parsed': 3,
+    }
+
+
+def test_disabled_measurement_records_nothing():
+    measure = stats.Measurement(enabled=False)
+    with measure.phase('load'):
+        pass
+    assert measure.seconds['load'] == 0
+
+
+def test_peak_bytes_only_counts_the_directive():
+    tracemalloc.start()
+    try:
+        before = bytearray(8_000_000)
+        measure = stats.Measurement(memory=True)
+        with measure.phase('load'):
+            data = bytearray(1_000_000)
+            del data
+        record = measure.record()
+    finally:
+        tracemalloc.stop()
+    del before
+    assert 1_000_000 <= record['peak_bytes'] < 2_000_000
+
+
+@pytest.mark.sphinx('html', testroot='stats')
+def test_report(app: SphinxTestApp, status: StringIO):
+    # The report is written when the build finishes.
+    app.build(force_all=True)
+
+    assert app._warncount == 0, '\n'.join(app.messagelog)
+    assert 'measured 2 directives' in status.getvalue()
+    report = json.loads((app.outdir / stats.REPORT_NAME).read_text())
+    assert report['totals']['directives'] == 2
+    csv_record = next(
+        r for r in report['directives'] if r['directive'] == 'datatemplate:csv'
+    )
+    assert csv_record['docname'] == 'index'
+    assert csv_record['lineno'] == 4
+    assert csv_record['source'] == 'sample.csv'
+    assert csv_record['lines'] > 5
+    assert csv_record['data_bytes'] > 0
+    assert csv_record['peak_bytes'] > 0
+    assert csv_record['load_seconds'] > 0
+    assert csv_record['parsed'] == 1
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+from io import StringIO
+from typing import TYPE_CHECKING
+
+import pytest
+from docutils import nodes
+
+from sphinxcontrib.datatemplates import helpers
+
+if TYPE_CHECKING:
+    from sphinx.testing.util import SphinxTestApp
+
+
+def test_make_table():
+    table = helpers.make_table(['A', 'B'], [[1, None], ['', '*x*']], 'T')
+    assert table['classes'] == []
+    assert table[0].astext() == 'T'
+    tgroup = table[1]
+    assert [c['colwidth'] for c in tgroup.findall(nodes.colspec)] == [50, 50]
+    thead, tbody = tgroup[2:]
+    assert [e.astext() for e in thead.findall(nodes.entry)] == ['A', 'B']
+    assert [e.astext() for e in tbody.findall(nodes.entry)] == [
+        '1',
+        'None',
+        '',
+        '*x*',
+    ]
+
+
+def test_make_table_from_mappings_widths():
+    table = helpers.make_table_from_mappings(
+        [('A', 'a'), ('B', 'b')], [{'a': 1}], '', [3, 1]
+    )
+    assert table['classes'] == ['colwidths-given']
+    assert not list(table.findall(nodes.title))
+    widths = [c['colwidth'] for c in table.findall(nodes.colspec)]
+    assert widths == [3, 1]
+    assert table.astext().split() == ['A', 'B', '1', 'None']
+
+
+def test_make_table_checks_columns():
+    with pytest.raises(ValueError, match='2 column widths for 1 columns'):
+        helpers.make_table(['A'], [], columns=[1, 2])
+    with pytest.raises(ValueError, match='row of 2 values for 1 columns'):
+        helpers.make_table(['A'], [[1, 2]])
+    with pytest.raises(ValueError, match='at least one column'):
+        helpers.make_table([], [])
+
+
+def _structure(table):
+    # Sphinx gives every table with a title its own id.
+    table = table.deepcopy()
+    table['ids'] = []
+    return table.pformat()
+
+
+@pytest.mark.sphinx('html', testroot='table')
+def test_table(app: SphinxTestApp, status: StringIO):
+    app.build(force_all=True)
+
+    assert app._warncount == 0, '\n'.join(app.messagelog)
+    doctree = app.env.get_doctree('index')
+    tables = list(doctree.findall(nodes.table))
+    assert len(tables) == 5
+    # The same table as the list-table, without parsing it.
+    assert _structure(tables[1]) == _structure(tables[0])
+    # Also when the output comes from the caches.
+    assert _structure(tables[4]) == _structure(tables[1])
+    assert tables[1].source == 'sample.csv'
+    # Cells are not parsed.
+    assert '<td><p>*beta*</p></td>' in (app.outdir / 'index.html').read_text()
+    # The table can be nested in other markup.
+    assert isinstance(tables[3].parent, nodes.list_item)
+    assert not list(doctree.findall(nodes.comment))
+
+
+@pytest.mark.sphinx('html', testroot='table-error')
+def test_table_error(app: SphinxTestApp, warning: StringIO):
+    # A short row is reported on the page instead of stopping the build.
+    app.build(force_all=True)
+
+    assert 'Error in table: got a row of 1 values for 2 columns' in (
+        warning.getvalue()
+    )
+    html = (app.outdir / 'index.html').read_text()
+    assert 'After the table.' in html
+    assert '<table' not in html
@@ -0,0 +1,40 @@
+import jinja2
+import pytest
+
+from sphinxcontrib.datatemplates import directive
+
+
+def test_resolve_templates(tmp_path, make_templates):
+    (tmp_path / 'page.tmpl').write_text(
+        '{% extends "base.tmpl" %}{% import "macros.tmpl" as m %}'
+    )
+    (tmp_path / 'base.tmpl').write_text('{% include "row.tmpl" %}')
+    (tmp_path / 'macros.tmpl').write_text('{% include ["a.tmpl", name] %}')
+    (tmp_path / 'row.tmpl').write_text('{{ data }}')
+    filenames, fingerprint = directive._resolve_templates(
+        make_templates(jinja2.FileSystemLoader(tmp_path)), 'page.tmpl'
+    )
+    assert sorted(filenames) == [
+        str(tmp_path / name)
+        for name in ['base.tmpl', 'macros.tmpl', 'page.tmpl', 'row.tmpl']
+    ]
+    # The name of one of the included templates is not known.
+    assert fingerprint is None
+
+
+@pytest.mark.sphinx('html', testroot='template-dependencies')
+def test_changed_template_triggers_reading(build):
+    app = build()
+    assert '2 added, 0 changed' in app.status.getvalue()
+    assert 'Start Key is value' in (app.outdir / 'index.html').read_text()
+
+    (app.srcdir / 'templates' / 'base.tmpl').write_text(
+        'Changed {% block body %}{% endblock %}'
+    )
+    app = build()
+    assert '0 added, 1 changed' in app.status.getvalue()
+    assert 'Changed Key is value' in (app.outdir / 'index.html').read_text()
+
+    (app.srcdir / 'templates' / 'row.tmpl').write_text('Row')
+    app = build()
+    assert '0 added, 2 changed' in app.status.getvalue()
@@ -0,0 +1,2 @@
+extensions = ["sphinxcontrib.datatemplates"]
+datatemplates_disk_cache = False
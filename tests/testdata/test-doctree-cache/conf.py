@@ -0,0 +1,3 @@
+extensions = ["sphinxcontrib.datatemplates"]
+datatemplates_doctree_cache_size = 16
+datatemplates_disk_cache = False
@@ -0,0 +1,3 @@
+extensions = ["sphinxcontrib.datatemplates"]
+datatemplates_prefetch = True
+datatemplates_disk_cache = False
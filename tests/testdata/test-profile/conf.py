@@ -0,0 +1,4 @@
+extensions = ["sphinxcontrib.datatemplates"]
+templates_path = ["templates"]
+datatemplates_profile = ["other"]
+datatemplates_disk_cache = False
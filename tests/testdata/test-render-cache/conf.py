@@ -0,0 +1,4 @@
+extensions = ["sphinxcontrib.datatemplates"]
+templates_path = ["templates"]
+datatemplates_render_cache_size = 16
+datatemplates_disk_cache = False
@@ -0,0 +1,4 @@
+extensions = ["sphinxcontrib.datatemplates"]
+datatemplates_stats = True
+datatemplates_stats_memory = True
+datatemplates_disk_cache = False
@@ -0,0 +1 @@
+extensions = ["sphinxcontrib.datatemplates"]
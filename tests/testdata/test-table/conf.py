@@ -0,0 +1,3 @@
+extensions = ["sphinxcontrib.datatemplates"]
+datatemplates_render_cache_size = 8
+datatemplates_doctree_cache_size = 8
@@ -0,0 +1,3 @@
+extensions = ["sphinxcontrib.datatemplates"]
+templates_path = ["templates"]
+datatemplates_disk_cache = False